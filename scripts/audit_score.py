@@ -4,10 +4,15 @@
 from __future__ import annotations
 
 import argparse
-import json
+import bisect
+import heapq
+import math
+from array import array
 from dataclasses import dataclass
 from pathlib import Path
 
+from script_common import json_loads
+
 
 @dataclass(frozen=True)
 class Metric:
@@ -31,6 +36,56 @@ METRICS: tuple[Metric, ...] = (
     Metric("ethical_auditable_governance", "Ethical/Auditable Governance", 5.0),
 )
 
+# Parallel views of METRICS so report rendering avoids per-row attribute loads.
+_KEYS: tuple[str, ...] = tuple(m.key for m in METRICS)
+_LABELS: tuple[str, ...] = tuple(m.label for m in METRICS)
+_WEIGHTS = array("d", (m.weight for m in METRICS))
+
+# Ascending band floors; _BAND_LABELS[i] applies when i thresholds are met.
+_BAND_THRESHOLDS = (60.0, 75.0, 90.0)
+_BAND_LABELS = (
+    "Not yet an agentic stack (traditional dev with LLM wrapper)",
+    "Viable but risky - major refactoring needed",
+    "Strong foundation - fix security/autonomy gaps",
+    "Production-ready one-person AI company stack (Zero-Human ready)",
+)
+
+_HEADER_TMPL = (
+    "# ZHC-Nova Audit Report - {iteration}\n"
+    "\n"
+    "{notes_block}"
+    "## Weighted Scorecard\n"
+    "\n"
+    "| # | Metric | Weight | Score (0-10) | Weighted |\n"
+    "|---|--------|--------|--------------|----------|\n"
+)
+# The index, label and weight columns are constant, so they are baked into a
+# single table template; only score/weighted pairs are formatted per report.
+_TABLE_TMPL = "".join(
+    f"| {idx} | {label.replace('{', '{{').replace('}', '}}')} | {weight:.0f}% | "
+    f"{{{2 * (idx - 1)}:.1f}} | {{{2 * (idx - 1) + 1}:.2f}} |\n"
+    for idx, (label, weight) in enumerate(zip(_LABELS, _WEIGHTS), start=1)
+)
+_FOOTER_TMPL = (
+    "|   | **TOTAL** | **100%** | - | **{total:.2f}/100** |\n"
+    "\n"
+    "## Result\n"
+    "\n"
+    "- Overall score: **{total:.2f}/100**\n"
+    "- Band: **{band}**\n"
+    "\n"
+    "## Lowest Metrics (Priority Fixes)\n"
+    "\n"
+    "{lowest}"
+    "\n"
+    "## Evidence Notes\n"
+    "\n"
+    "- Add file-path evidence for each metric in this section each iteration.\n"
+)
+_LOWEST_TMPL = (
+    "- {label}: {score:.1f}/10 (weight {weight:.0f}%, contribution {weighted:.2f})\n"
+)
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Generate weighted audit report")
@@ -50,79 +105,54 @@ def parse_args() -> argparse.Namespace:
 
 
 def load_scores(path: Path) -> dict[str, float]:
-    payload = json.loads(path.read_text(encoding="utf-8"))
+    payload = json_loads(path.read_bytes())
     if not isinstance(payload, dict):
         raise ValueError("Scores file must contain a JSON object")
-    scores: dict[str, float] = {}
-    for metric in METRICS:
-        if metric.key not in payload:
-            raise ValueError(f"Missing score for metric: {metric.key}")
-        raw = payload[metric.key]
+    missing = [key for key in _KEYS if key not in payload]
+    if missing:
+        raise ValueError(f"Missing score for metric: {missing[0]}")
+    values = [payload[key] for key in _KEYS]
+    for key, raw in zip(_KEYS, values):
         if not isinstance(raw, (int, float)):
-            raise ValueError(f"Score for {metric.key} must be numeric")
-        if raw < 0 or raw > 10:
-            raise ValueError(f"Score for {metric.key} must be between 0 and 10")
-        scores[metric.key] = float(raw)
-    return scores
+            raise ValueError(f"Score for {key} must be numeric")
+        # NaN fails every comparison, so it would slip past the range check.
+        if not math.isfinite(raw) or raw < 0 or raw > 10:
+            raise ValueError(f"Score for {key} must be between 0 and 10")
+    return dict(zip(_KEYS, map(float, values)))
 
 
 def score_band(total: float) -> str:
-    if total >= 90:
-        return "Production-ready one-person AI company stack (Zero-Human ready)"
-    if total >= 75:
-        return "Strong foundation - fix security/autonomy gaps"
-    if total >= 60:
-        return "Viable but risky - major refactoring needed"
-    return "Not yet an agentic stack (traditional dev with LLM wrapper)"
+    return _BAND_LABELS[bisect.bisect_right(_BAND_THRESHOLDS, total)]
 
 
 def render_report(iteration: str, notes: str, scores: dict[str, float]) -> str:
-    lines: list[str] = []
-    lines.append(f"# ZHC-Nova Audit Report - {iteration}")
-    lines.append("")
-    if notes:
-        lines.append(f"Notes: {notes}")
-        lines.append("")
-
-    lines.append("## Weighted Scorecard")
-    lines.append("")
-    lines.append("| # | Metric | Weight | Score (0-10) | Weighted |")
-    lines.append("|---|--------|--------|--------------|----------|")
-
-    total = 0.0
-    weighted_rows: list[tuple[float, str, float, float]] = []
-    for idx, metric in enumerate(METRICS, start=1):
-        score = scores[metric.key]
-        weighted = (score / 10.0) * metric.weight
-        total += weighted
-        weighted_rows.append((weighted, metric.label, score, metric.weight))
-        lines.append(
-            f"| {idx} | {metric.label} | {metric.weight:.0f}% | {score:.1f} | {weighted:.2f} |"
+    weighted_vec = [
+        (scores[key] / 10.0) * weight for key, weight in zip(_KEYS, _WEIGHTS)
+    ]
+    total = math.fsum(weighted_vec)
+    rows = _TABLE_TMPL.format(
+        *(
+            value
+            for key, weighted in zip(_KEYS, weighted_vec)
+            for value in (scores[key], weighted)
         )
-
-    lines.append(f"|   | **TOTAL** | **100%** | - | **{total:.2f}/100** |")
-    lines.append("")
-    lines.append("## Result")
-    lines.append("")
-    lines.append(f"- Overall score: **{total:.2f}/100**")
-    lines.append(f"- Band: **{score_band(total)}**")
-    lines.append("")
-
-    lines.append("## Lowest Metrics (Priority Fixes)")
-    lines.append("")
-    for weighted, label, score, weight in sorted(
-        weighted_rows, key=lambda item: item[0]
-    )[:3]:
-        lines.append(
-            f"- {label}: {score:.1f}/10 (weight {weight:.0f}%, contribution {weighted:.2f})"
+    )
+    lowest = "".join(
+        _LOWEST_TMPL.format(
+            label=_LABELS[idx],
+            score=scores[_KEYS[idx]],
+            weight=_WEIGHTS[idx],
+            weighted=weighted_vec[idx],
+        )
+        for idx in heapq.nsmallest(3, range(len(_KEYS)), key=weighted_vec.__getitem__)
+    )
+    return (
+        _HEADER_TMPL.format(
+            iteration=iteration, notes_block=f"Notes: {notes}\n\n" if notes else ""
         )
-    lines.append("")
-    lines.append("## Evidence Notes")
-    lines.append("")
-    lines.append(
-        "- Add file-path evidence for each metric in this section each iteration."
+        + rows
+        + _FOOTER_TMPL.format(total=total, band=score_band(total), lowest=lowest)
     )
-    return "\n".join(lines) + "\n"
 
 
 def main() -> int:
@@ -132,7 +162,7 @@ def main() -> int:
     scores = load_scores(scores_path)
     report = render_report(args.iteration, args.notes, scores)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(report, encoding="utf-8")
+    output_path.write_bytes(report.encode("utf-8"))
     print(f"Wrote report: {output_path}")
     return 0
 
@@ -11,22 +11,46 @@ Scenarios:
 from __future__ import annotations
 
 import argparse
+import functools
 import json
+import mmap
 import os
-import runpy
+import re
 import sqlite3
 import subprocess
-import tempfile
+import sys
+import threading
 import time
+import types
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from script_common import (
+    json_dumps,
+    json_dumps_pretty,
+    json_loads,
+    load_module,
+    service_health,
+)
+
 
 ROOT = Path(__file__).resolve().parents[1]
 BOT_PATH = ROOT / "services/telegram-control/bot_longpoll.py"
 REGISTRY_PATH = ROOT / "shared/task-registry/task_registry.py"
 ROUTER_PATH = ROOT / "services/task-router/router.py"
+# Same expression as idx_tasks_trace_id_valid (schema.sql), so this is an
+# index lookup.
+TRACE_TASK_COUNT_SQL = (
+    "SELECT COUNT(*) FROM tasks "
+    "WHERE CASE WHEN json_valid(metadata_json) "
+    "THEN json_extract(metadata_json, '$.trace_id') END = ?"
+)
+
+_MODULE_CACHE: dict[str, types.ModuleType] = {}
+_CONN_LOCK = threading.Lock()
+_CONN: dict[str, sqlite3.Connection] = {}
 
 
 def utc_now() -> str:
@@ -49,53 +73,34 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def load_env_file(path: Path) -> None:
-    if not path.exists():
-        return
-    for raw in path.read_text(encoding="utf-8").splitlines():
+@functools.lru_cache(maxsize=8)
+def _parse_env(path_str: str, mtime_ns: int) -> dict[str, str]:
+    # mtime_ns is part of the cache key so an edited file is re-parsed.
+    parsed: dict[str, str] = {}
+    for raw in Path(path_str).read_bytes().splitlines():
         line = raw.strip()
-        if not line or line.startswith("#") or "=" not in line:
+        if not line or line.startswith(b"#") or b"=" not in line:
             continue
-        key, value = line.split("=", 1)
+        key, value = line.split(b"=", 1)
         key = key.strip()
         value = value.strip()
         if not key:
             continue
-        if (value.startswith('"') and value.endswith('"')) or (
-            value.startswith("'") and value.endswith("'")
+        if (value.startswith(b'"') and value.endswith(b'"')) or (
+            value.startswith(b"'") and value.endswith(b"'")
         ):
             value = value[1:-1]
-        os.environ.setdefault(key, value)
-
-
-def run_shell(
-    cmd: list[str], env: dict[str, str] | None = None, timeout: int = 120
-) -> dict[str, Any]:
-    proc = subprocess.run(
-        cmd,
-        cwd=ROOT,
-        env=env,
-        capture_output=True,
-        text=True,
-        timeout=timeout,
-    )
-    return {
-        "returncode": proc.returncode,
-        "stdout": proc.stdout.strip(),
-        "stderr": proc.stderr.strip(),
-    }
+        parsed.setdefault(key.decode("utf-8"), value.decode("utf-8"))
+    return parsed
 
 
-def run_json(
-    cmd: list[str], env: dict[str, str] | None = None, timeout: int = 120
-) -> dict[str, Any]:
-    out = run_shell(cmd, env=env, timeout=timeout)
-    if out["returncode"] != 0:
-        raise RuntimeError(out["stderr"] or out["stdout"] or "command failed")
+def load_env_file(path: Path) -> None:
     try:
-        return json.loads(out["stdout"])
-    except json.JSONDecodeError as exc:
-        raise RuntimeError(f"invalid_json: {out['stdout'][:200]}") from exc
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return
+    parsed = _parse_env(str(path), mtime_ns)
+    os.environ.update({k: v for k, v in parsed.items() if k not in os.environ})
 
 
 def db_path() -> Path:
@@ -104,73 +109,87 @@ def db_path() -> Path:
     ).resolve()
 
 
-def count_tasks() -> int:
-    with sqlite3.connect(db_path()) as conn:
-        row = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()
-        return int(row[0] if row else 0)
+def _conn() -> sqlite3.Connection:
+    # One autocommit connection per DB path, shared by the scenario threads.
+    # Only connection-local pragmas: the suite must not change the journal
+    # mode or durability of the registry it inspects.
+    path = str(db_path())
+    with _CONN_LOCK:
+        conn = _CONN.get(path)
+        if conn is None:
+            conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")
+            _CONN[path] = conn
+        return conn
+
+
+def close_conns() -> None:
+    with _CONN_LOCK:
+        for conn in _CONN.values():
+            conn.close()
+        _CONN.clear()
 
 
 def count_tasks_for_trace(trace_id: str) -> int:
-    pattern = f'%"trace_id":"{trace_id}"%'
-    with sqlite3.connect(db_path()) as conn:
-        row = conn.execute(
-            "SELECT COUNT(*) FROM tasks WHERE metadata_json LIKE ?",
-            (pattern,),
-        ).fetchone()
-        return int(row[0] if row else 0)
+    conn = _conn()
+    with _CONN_LOCK:
+        row = conn.execute(TRACE_TASK_COUNT_SQL, (trace_id,)).fetchone()
+    return int(row[0] if row else 0)
+
+
+def expire_dispatch_lease(task_id: str) -> None:
+    # Simulates the owner dying past its lease TTL without waiting it out.
+    conn = _conn()
+    with _CONN_LOCK:
+        conn.execute(
+            "UPDATE task_dispatch_lease SET lease_expires_at = ? WHERE task_id = ?",
+            ("2000-01-01T00:00:00+00:00", task_id),
+        )
 
 
 def read_audit_entries(update_id: int) -> list[dict[str, Any]]:
     log_path = ROOT / "storage/memory/telegram_command_audit.jsonl"
-    if not log_path.exists():
+    try:
+        f = log_path.open("rb")
+    except FileNotFoundError:
         return []
+    # Tolerate either separator style so whole lines can be matched in C and
+    # only candidate lines are decoded; the int check guards anything odd.
+    pattern = re.compile(rb'^[^\n]*"update_id":\s*%d\b[^\n]*$' % update_id, re.M)
     rows: list[dict[str, Any]] = []
-    for line in log_path.read_text(encoding="utf-8").splitlines():
-        if not line.strip():
-            continue
-        try:
-            payload = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        if int(payload.get("update_id", -1)) == update_id:
-            rows.append(payload)
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for match in pattern.finditer(mm):
+                try:
+                    payload = json_loads(match.group(0))
+                except json.JSONDecodeError:
+                    continue
+                if int(payload.get("update_id", -1)) == update_id:
+                    rows.append(payload)
     return rows
 
 
-def service_health() -> dict[str, Any]:
-    svc = run_shell(
-        [
-            "systemctl",
-            "--user",
-            "is-active",
-            "zeroclaw-gateway.service",
-            "zhc-telegram-control.service",
-        ],
-        timeout=20,
-    )
-    curl = run_shell(["curl", "-sS", "http://127.0.0.1:3131/health"], timeout=20)
-    payload: dict[str, Any] = {}
-    if curl["returncode"] == 0 and curl["stdout"]:
-        try:
-            payload = json.loads(curl["stdout"])
-        except json.JSONDecodeError:
-            payload = {"raw": curl["stdout"]}
-    states = [x for x in svc["stdout"].splitlines() if x.strip()]
-    return {
-        "services_ok": svc["returncode"] == 0 and all(s == "active" for s in states),
-        "service_states": states,
-        "gateway_ok": payload.get("status") == "ok",
-        "gateway": payload,
-    }
+def _load(path: Path, instance: str = "") -> dict[str, Any]:
+    name = f"_zhc_{path.stem}_{instance}" if instance else f"_zhc_{path.stem}"
+    mod = _MODULE_CACHE.get(name)
+    if mod is None:
+        mod = load_module(path, name)
+        _MODULE_CACHE[name] = mod
+    return mod.__dict__
 
 
-def load_bot_module() -> dict[str, Any]:
-    mod = runpy.run_path(str(BOT_PATH))
-    return mod
+def load_bot_module(instance: str = "") -> dict[str, Any]:
+    # Scenarios that patch send_message use their own instance so they can
+    # run concurrently without racing on shared module globals.
+    return _load(BOT_PATH, instance)
 
 
-def scenario_duplicate_update_replay(base_uid: int) -> dict[str, Any]:
-    mod = load_bot_module()
+def scenario_duplicate_update_replay(
+    base_uid: int, mod: dict[str, Any]
+) -> dict[str, Any]:
     cfg = mod["load_config"]()
     process_update = mod["process_update"]
     process_update.__globals__["send_message"] = lambda config, chat_id, text: None
@@ -213,7 +232,7 @@ def scenario_duplicate_update_replay(base_uid: int) -> dict[str, Any]:
 
 
 def scenario_restart_during_running_recovery() -> dict[str, Any]:
-    reg = runpy.run_path(str(REGISTRY_PATH))
+    reg = _load(REGISTRY_PATH)
     task_id = f"task-chaos-lease-{int(time.time())}"
     reg["create_task"](
         db_path(),
@@ -229,7 +248,7 @@ def scenario_restart_during_running_recovery() -> dict[str, Any]:
     )
     reg["enqueue_dispatch_lease"](db_path(), task_id, "owner-a", 1)
     reg["claim_dispatch_lease"](db_path(), task_id, "owner-a", 1)
-    time.sleep(1.2)
+    expire_dispatch_lease(task_id)
     reg["reconcile_dispatch_leases"](db_path(), "owner-b")
     claim = reg["claim_dispatch_lease"](db_path(), task_id, "owner-b", 120)
     lease = reg["get_dispatch_lease"](db_path(), task_id)["lease"]
@@ -249,49 +268,30 @@ def scenario_restart_during_running_recovery() -> dict[str, Any]:
 
 
 def scenario_forced_dispatch_retry() -> dict[str, Any]:
-    now = int(time.time())
-    tmp_dir = Path(tempfile.gettempdir())
-    wrapper = tmp_dir / f"zhc_chaos_retry_cmd_{now}.sh"
-    counter = tmp_dir / f"zhc_chaos_counter_{now}.txt"
-    wrapper.write_text(
-        "#!/usr/bin/env bash\n"
-        "set -euo pipefail\n"
-        f'COUNTER="{counter}"\n'
-        "n=0\n"
-        'if [[ -f "$COUNTER" ]]; then n=$(cat "$COUNTER"); fi\n'
-        "n=$((n+1))\n"
-        'printf \'%s\' "$n" > "$COUNTER"\n'
-        "if [[ $n -eq 1 ]]; then\n"
-        "  echo 'dispatch timeout simulated' >&2\n"
-        "  exit 1\n"
-        "fi\n"
-        "echo READY\n"
-        "exit 0\n",
-        encoding="utf-8",
+    state = {"calls": 0}
+
+    def flaky_run(cmd: list[str], **kwargs: Any) -> subprocess.CompletedProcess[str]:
+        state["calls"] += 1
+        if state["calls"] == 1:
+            return subprocess.CompletedProcess(
+                cmd, 1, stdout="", stderr="dispatch timeout simulated\n"
+            )
+        return subprocess.CompletedProcess(cmd, 0, stdout="READY\n", stderr="")
+
+    # Private router instance whose subprocess seam fails once, then succeeds.
+    # Retry settings are pinned on this instance rather than in os.environ,
+    # which the concurrently running scenarios' subprocesses would inherit.
+    router = _load(ROUTER_PATH, "retry")
+    router["subprocess"] = types.SimpleNamespace(
+        run=flaky_run,
+        CompletedProcess=subprocess.CompletedProcess,
+        TimeoutExpired=subprocess.TimeoutExpired,
     )
-    wrapper.chmod(0o755)
-
-    router = runpy.run_path(str(ROUTER_PATH))
-    prev_retry_max = os.environ.get("ZHC_DISPATCH_RETRY_MAX")
-    prev_timeout = os.environ.get("ZHC_DISPATCH_TIMEOUT_SECONDS")
-    os.environ["ZHC_DISPATCH_RETRY_MAX"] = "1"
-    os.environ["ZHC_DISPATCH_TIMEOUT_SECONDS"] = "5"
-    proc = router["run_command"]([str(wrapper)])
-    if prev_retry_max is None:
-        os.environ.pop("ZHC_DISPATCH_RETRY_MAX", None)
-    else:
-        os.environ["ZHC_DISPATCH_RETRY_MAX"] = prev_retry_max
-    if prev_timeout is None:
-        os.environ.pop("ZHC_DISPATCH_TIMEOUT_SECONDS", None)
-    else:
-        os.environ["ZHC_DISPATCH_TIMEOUT_SECONDS"] = prev_timeout
-
-    attempts = 0
-    if counter.exists():
-        try:
-            attempts = int(counter.read_text(encoding="utf-8").strip() or "0")
-        except ValueError:
-            attempts = 0
+    router["dispatch_retry_max"] = lambda: 1
+    router["dispatch_timeout_seconds"] = lambda: 5
+    proc = router["run_command"](["chaos-dispatch"])
+
+    attempts = state["calls"]
     passed = proc.returncode == 0 and attempts >= 2 and "READY" in str(proc.stdout)
     return {
         "name": "forced_dispatch_retry",
@@ -303,8 +303,9 @@ def scenario_forced_dispatch_retry() -> dict[str, Any]:
     }
 
 
-def scenario_success_then_reporting_failure(base_uid: int) -> dict[str, Any]:
-    mod = load_bot_module()
+def scenario_success_then_reporting_failure(
+    base_uid: int, mod: dict[str, Any]
+) -> dict[str, Any]:
     cfg = mod["load_config"]()
     process_update = mod["process_update"]
 
@@ -363,13 +364,26 @@ def main() -> int:
 
     started = time.time()
     base_uid = 920000000 + int(started) % 1000000
-    scenarios: list[dict[str, Any]] = []
+
+    # Load each bot instance once, before the scenario threads start.
+    replay_bot = load_bot_module("replay")
+    report_bot = load_bot_module("report")
 
     pre = service_health()
-    scenarios.append(scenario_duplicate_update_replay(base_uid))
-    scenarios.append(scenario_restart_during_running_recovery())
-    scenarios.append(scenario_forced_dispatch_retry())
-    scenarios.append(scenario_success_then_reporting_failure(base_uid))
+    # Scenarios use distinct update/task ids, so they can overlap their I/O.
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [
+                pool.submit(scenario_duplicate_update_replay, base_uid, replay_bot),
+                pool.submit(scenario_restart_during_running_recovery),
+                pool.submit(scenario_forced_dispatch_retry),
+                pool.submit(
+                    scenario_success_then_reporting_failure, base_uid, report_bot
+                ),
+            ]
+            scenarios = [f.result() for f in futures]
+    finally:
+        close_conns()
     post = service_health()
 
     failed = [s for s in scenarios if not s.get("passed")]
@@ -385,12 +399,13 @@ def main() -> int:
 
     out_path = Path(args.output).resolve()
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(json.dumps(report, indent=2, sort_keys=True), encoding="utf-8")
+    pretty = json_dumps_pretty(report)
+    out_path.write_bytes(pretty)
 
-    if args.json:
-        print(json.dumps(report, ensure_ascii=True))
-    else:
-        print(json.dumps(report, indent=2, sort_keys=True))
+    # Only --json needs a second (compact) encoding; otherwise reuse the bytes.
+    sys.stdout.buffer.write(json_dumps(report) if args.json else pretty)
+    sys.stdout.buffer.write(b"\n")
+    sys.stdout.flush()
 
     return 0 if report["ok"] else 1
 
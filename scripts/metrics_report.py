@@ -4,13 +4,22 @@
 from __future__ import annotations
 
 import argparse
+import bisect
 import json
+import mmap
+import os
+import re
 import sqlite3
-from dataclasses import dataclass
+import sys
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from statistics import median
-from typing import Any
+from typing import Any, Sequence
+
+from script_common import json_dumps_pretty, json_loads
 
 
 def utc_now() -> datetime:
@@ -26,15 +35,32 @@ def parse_ts(value: str | None) -> datetime | None:
         return None
 
 
-def percentile(values: list[float], p: float) -> float:
-    if not values:
-        return 0.0
-    if len(values) == 1:
-        return values[0]
+def minutes_between(start_value: str | None, end_value: str | None) -> float | None:
+    # Only called where a delta is reported; ordering elsewhere is done on the
+    # raw ISO strings in SQL, so no datetimes are built just to compare.
+    if not start_value or not end_value:
+        return None
+    try:
+        start = datetime.fromisoformat(start_value)
+        end = datetime.fromisoformat(end_value)
+    except ValueError:
+        return None
+    if end < start:
+        return None
+    return (end - start).total_seconds() / 60.0
+
+
+def summary_stats(values: Sequence[float]) -> tuple[float, float, float]:
+    # (median, p90, mean) from one sort; all zero for an empty series. The
+    # median matches statistics.median and p90 is the nearest-rank index.
+    n = len(values)
+    if not n:
+        return 0, 0, 0
     sorted_vals = sorted(values)
-    idx = int(round((len(sorted_vals) - 1) * p))
-    idx = max(0, min(idx, len(sorted_vals) - 1))
-    return sorted_vals[idx]
+    mid = n // 2
+    med = sorted_vals[mid] if n % 2 else (sorted_vals[mid - 1] + sorted_vals[mid]) / 2
+    idx = max(0, min(int(round((n - 1) * 0.90)), n - 1))
+    return med, sorted_vals[idx], sum(values) / n
 
 
 def default_db_path() -> Path:
@@ -49,6 +75,11 @@ def default_audit_log_path() -> Path:
 class Window:
     start: datetime
     end: datetime
+    # ISO bounds bound into every window query, formatted once.
+    params: tuple[str, str] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.params = (self.start.isoformat(), self.end.isoformat())
 
 
 def parse_args() -> argparse.Namespace:
@@ -73,98 +104,412 @@ def parse_args() -> argparse.Namespace:
 
 
 def connect(db_path: Path) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    # The report only reads, so open read-only and give the handful of window
+    # scans a large page cache and mmap window. Rows come back as plain
+    # tuples and are unpacked positionally.
+    conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA mmap_size=268435456")
     return conn
 
 
 def fetch_tasks(
     conn: sqlite3.Connection, window: Window, limit: int
-) -> list[sqlite3.Row]:
+) -> list[tuple[Any, ...]]:
+    # Per-task fields still needed in Python: the heavy-gate task ids, the
+    # dispatch durations behind the p90 and, for heavy tasks, the latest
+    # reviewer_artifact_recorded event (plain or trace-wrapped JSON detail).
     return conn.execute(
         """
-        SELECT task_id, task_type, route_class, status, risk_level, created_at, updated_at, metadata_json
+        SELECT
+            task_id,
+            route_class,
+            json_extract(NULLIF(metadata_json, ''), '$.dispatch_duration_ms')
+                AS dispatch_duration_ms,
+            CASE WHEN route_class = 'UBUNTU_HEAVY' THEN (
+                SELECT e.detail
+                FROM task_events e
+                WHERE e.task_id = tasks.task_id
+                  AND e.event_type = 'router'
+                  AND (
+                      e.detail GLOB 'reviewer_artifact_recorded verdict=*'
+                      OR (
+                          json_valid(e.detail)
+                          AND json_extract(e.detail, '$.event')
+                              = 'reviewer_artifact_recorded'
+                      )
+                  )
+                ORDER BY e.created_at DESC, e.id DESC
+                LIMIT 1
+            ) END AS review_detail
         FROM tasks
         WHERE created_at >= ? AND created_at <= ?
         ORDER BY created_at DESC
         LIMIT ?
         """,
-        (window.start.isoformat(), window.end.isoformat(), limit),
+        (*window.params, limit),
+    ).fetchall()
+
+
+def fetch_telemetry_aggregates(
+    conn: sqlite3.Connection, window: Window, limit: int
+) -> tuple[Any, ...]:
+    return conn.execute(
+        """
+        WITH t AS (
+            SELECT
+                json_extract(meta, '$.estimated_cost_usd') AS cost,
+                json_extract(meta, '$.estimated_total_tokens') AS tokens,
+                json_extract(meta, '$.compression_ratio') AS ratio,
+                json_extract(meta, '$.cost_source') AS source
+            FROM (
+                SELECT NULLIF(metadata_json, '') AS meta
+                FROM tasks
+                WHERE created_at >= ? AND created_at <= ?
+                ORDER BY created_at DESC
+                LIMIT ?
+            )
+        )
+        SELECT
+            TOTAL(cost) AS total_cost,
+            COALESCE(SUM(CAST(tokens AS INTEGER)), 0) AS total_tokens,
+            AVG(CASE WHEN ratio > 0 THEN ratio END) AS avg_compression_ratio,
+            COALESCE(SUM(source = 'openrouter_api'), 0) AS openrouter_api,
+            COALESCE(SUM(source = 'heuristic'), 0) AS heuristic,
+            COALESCE(
+                SUM(source IS NULL OR source NOT IN ('openrouter_api', 'heuristic')),
+                0
+            ) AS unknown
+        FROM t
+        """,
+        (*window.params, limit),
+    ).fetchone()
+
+
+def fetch_task_counts(
+    conn: sqlite3.Connection, window: Window, limit: int
+) -> list[tuple[Any, ...]]:
+    # Same task set as fetch_tasks (window + limit), bucketed in SQL; newest
+    # group first so dict keys keep their first-seen order.
+    return conn.execute(
+        """
+        SELECT status, route_class, risk_level, COUNT(*) AS cnt
+        FROM (
+            SELECT status, route_class, risk_level, created_at
+            FROM tasks
+            WHERE created_at >= ? AND created_at <= ?
+            ORDER BY created_at DESC
+            LIMIT ?
+        )
+        GROUP BY status, route_class, risk_level
+        ORDER BY MAX(created_at) DESC
+        """,
+        (*window.params, limit),
     ).fetchall()
 
 
-def fetch_policy_block_events(
+def fetch_policy_block_counts(
     conn: sqlite3.Connection, window: Window
-) -> list[sqlite3.Row]:
+) -> list[tuple[Any, ...]]:
+    # idx_task_events_type_created seeks the router rows in the window; the
+    # detail prefix is matched as an exact binary range on those rows.
     return conn.execute(
         """
-        SELECT detail
+        SELECT detail, COUNT(*) AS cnt
         FROM task_events
         WHERE created_at >= ? AND created_at <= ?
           AND event_type = 'router'
-          AND detail LIKE 'policy_block reason=%'
-        ORDER BY created_at DESC
+          AND detail >= 'policy_block reason=' AND detail < 'policy_block reason>'
+        GROUP BY detail
+        ORDER BY MAX(created_at) DESC
         """,
-        (window.start.isoformat(), window.end.isoformat()),
+        window.params,
     ).fetchall()
 
 
-def fetch_approvals(conn: sqlite3.Connection, window: Window) -> list[sqlite3.Row]:
+def fetch_approval_counts(
+    conn: sqlite3.Connection, window: Window
+) -> list[tuple[Any, ...]]:
     return conn.execute(
         """
-        SELECT task_id, status, created_at, updated_at
+        SELECT status, COUNT(*) AS cnt
         FROM approvals
         WHERE created_at >= ? AND created_at <= ?
-        ORDER BY created_at DESC
+        GROUP BY status
         """,
-        (window.start.isoformat(), window.end.isoformat()),
+        window.params,
     ).fetchall()
 
 
-def fetch_review_events(conn: sqlite3.Connection, window: Window) -> list[sqlite3.Row]:
-    return conn.execute(
+def fetch_approval_latencies(conn: sqlite3.Connection, window: Window) -> list[float]:
+    rows = conn.execute(
         """
-        SELECT task_id, detail, created_at
-        FROM task_events
+        SELECT created_at, updated_at
+        FROM approvals
         WHERE created_at >= ? AND created_at <= ?
-          AND event_type = 'router'
-          AND (
-              detail = 'review_gate_pending'
-              OR detail LIKE 'reviewer_artifact_recorded verdict=%'
-          )
-        ORDER BY created_at ASC
+          AND status IN ('approved', 'rejected')
         """,
-        (window.start.isoformat(), window.end.isoformat()),
+        window.params,
     ).fetchall()
+    latencies: list[float] = []
+    for created_at, updated_at in rows:
+        minutes = minutes_between(created_at, updated_at)
+        if minutes is not None:
+            latencies.append(minutes)
+    return latencies
+
+
+def fetch_review_gate_timelines(
+    conn: sqlite3.Connection, window: Window
+) -> list[tuple[Any, ...]]:
+    # One row per task: first fail/pass verdict timestamps plus a
+    # [pending_at, pass_at] pair for every pass verdict, where pending_at is
+    # the latest preceding review_gate_pending event. Latencies are taken in
+    # Python because julianday() only resolves milliseconds.
+    return conn.execute(
+        """
+        WITH ev AS (
+            SELECT
+                task_id,
+                detail,
+                created_at,
+                MAX(CASE WHEN detail = 'review_gate_pending' THEN created_at END)
+                    OVER (
+                        PARTITION BY task_id
+                        ORDER BY created_at
+                        ROWS UNBOUNDED PRECEDING
+                    ) AS pending_at
+            FROM task_events
+            WHERE created_at >= ? AND created_at <= ?
+              AND event_type = 'router'
+              AND (
+                  detail = 'review_gate_pending'
+                  OR (
+                      detail >= 'reviewer_artifact_recorded verdict='
+                      AND detail < 'reviewer_artifact_recorded verdict>'
+                  )
+              )
+        )
+        SELECT
+            task_id,
+            MIN(CASE WHEN instr(detail, 'verdict=fail') > 0 THEN created_at END)
+                AS first_fail_at,
+            MIN(
+                CASE
+                    WHEN instr(detail, 'verdict=fail') = 0
+                     AND instr(detail, 'verdict=pass') > 0
+                    THEN created_at
+                END
+            ) AS first_pass_at,
+            json_group_array(json_array(pending_at, created_at)) FILTER (
+                WHERE detail GLOB 'reviewer_artifact_recorded verdict=pass*'
+                  AND pending_at IS NOT NULL
+            ) AS gate_spans
+        FROM ev
+        GROUP BY task_id
+        """,
+        window.params,
+    ).fetchall()
+
+
+AUDIT_TS_RE = re.compile(rb'"ts":\s*"([^"]+)"')
+# Leading command token up to whitespace or a @botname suffix; callers only
+# use it on text starting with "/", so it always matches.
+COMMAND_RE = re.compile(r"[^\s@]+")
+# One anchored match both checks the prefix and strips the reason.
+POLICY_REASON_RE = re.compile(r"policy_block reason=\s*(.*?)\s*\Z", re.S)
+UTC_SUFFIX = b"+00:00"
+REVIEW_EVENT_RE = re.compile(
+    r"reviewer_artifact_recorded verdict=(pass|fail) reason_code=(\S+) "
+)
+TASK_STORAGE_DIR = os.path.join("storage", "tasks")
+REVIEWER_ARTIFACT = os.path.join("artifacts", "reviewer.json")
+REVIEW_IO_WORKERS = 16
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_OTHER = 2
+# Command outcome buckets; anything not listed is not eligible for the
+# success/error rates.
+COMMAND_STATUS_CATEGORY = {
+    "ok": STATUS_OK,
+    "idempotent_replay": STATUS_OK,
+    "error": STATUS_ERROR,
+    "command_timeout": STATUS_ERROR,
+    "idempotency_conflict": STATUS_ERROR,
+}
+PROGRESS_STATUSES = frozenset({"ok", "idempotent_replay", "user_error", "error"})
+REVIEW_CHECKLIST_KEYS = (
+    "policy_safety",
+    "correctness",
+    "tests",
+    "rollback",
+    "approval_constraints",
+)
+
+
+def parse_reviewer_artifact(data: bytes) -> tuple[str, str, bool]:
+    try:
+        payload = json_loads(data)
+    except json.JSONDecodeError:
+        return "invalid", "", False
+    verdict = str(payload.get("verdict", "missing")).lower().strip()
+    reason_code = str(payload.get("reason_code", "") or "")
+    checklist = payload.get("checklist", {})
+    schema_complete = isinstance(checklist, dict) and all(
+        isinstance(checklist.get(k), bool) for k in REVIEW_CHECKLIST_KEYS
+    )
+    return verdict, reason_code, schema_complete
+
+
+def read_reviewer_artifact(task_id: str) -> tuple[str, str, bool] | None:
+    review_path = os.path.join(TASK_STORAGE_DIR, task_id, REVIEWER_ARTIFACT)
+    try:
+        with open(review_path, "rb") as handle:
+            data = handle.read()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return parse_reviewer_artifact(data)
+
+
+def parse_review_event(detail: str | None) -> tuple[str, str, bool] | None:
+    # The router writes reviewer.json and then records this event with the
+    # same verdict and reason code; its checklist is always normalised to the
+    # full key set, so the artifact's schema is complete. None means the
+    # event is absent or not in the router's shape and the file is the
+    # source of truth.
+    if not detail:
+        return None
+    if detail[0] == "{":
+        try:
+            payload = json_loads(detail)
+        except json.JSONDecodeError:
+            return None
+        detail = str(payload.get("detail", ""))
+    match = REVIEW_EVENT_RE.match(detail)
+    if match is None:
+        return None
+    verdict, reason_code = match.groups()
+    return verdict, "" if reason_code == "none" else reason_code, True
+
+
+def load_review_summaries(
+    task_ids: list[str],
+) -> dict[str, tuple[str, str, bool] | None]:
+    # None means no artifact. The reads are independent, so they fan out over
+    # a thread pool.
+    results: dict[str, tuple[str, str, bool] | None] = {}
+    if not task_ids:
+        return results
+    # One directory listing rules out tasks that never got a storage dir
+    # without a failed open per task.
+    try:
+        with os.scandir(TASK_STORAGE_DIR) as entries:
+            task_dirs = {entry.name for entry in entries}
+    except FileNotFoundError:
+        task_dirs = set()
+    candidates = []
+    for task_id in task_ids:
+        if task_id in task_dirs:
+            candidates.append(task_id)
+        else:
+            results[task_id] = None
+    with ThreadPoolExecutor(max_workers=REVIEW_IO_WORKERS) as pool:
+        results.update(zip(candidates, pool.map(read_reviewer_artifact, candidates)))
+    return results
 
 
 def parse_policy_reason(detail: str) -> str:
-    prefix = "policy_block reason="
-    if not detail.startswith(prefix):
+    match = POLICY_REASON_RE.match(detail)
+    if match is None:
         return "unknown"
-    return detail[len(prefix) :].strip() or "unknown"
+    return match.group(1) or "unknown"
+
+
+def audit_window_offset(mm: mmap.mmap, start: datetime) -> int:
+    # The audit log is append-only, so lines are ts-ordered and ISO-8601 UTC
+    # strings sort lexically. Lines without a comparable UTC ts are treated
+    # as in-window, which can only widen the scan.
+    key = start.astimezone(timezone.utc).isoformat().encode("ascii")
+    lo, hi = 0, len(mm)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        line_start = mm.rfind(b"\n", 0, mid) + 1
+        line_end = mm.find(b"\n", mid)
+        if line_end < 0:
+            line_end = len(mm)
+        match = AUDIT_TS_RE.search(mm, line_start, line_end)
+        ts = match.group(1) if match else b""
+        if ts.endswith(UTC_SUFFIX) and ts < key:
+            lo = line_end + 1
+        else:
+            hi = line_start
+    return lo
 
 
-def load_telegram_audit(path: Path, window: Window) -> list[dict[str, Any]]:
+@dataclass
+class TelegramColumns:
+    # Column-per-field view of the in-window audit rows; the parsed dicts are
+    # dropped as soon as the fields summarize needs are projected out.
+    statuses: list[str] = field(default_factory=list)
+    timestamps: list[datetime] = field(default_factory=list)
+    texts: list[str] = field(default_factory=list)
+    classes: list[str] = field(default_factory=list)
+    has_trace: list[bool] = field(default_factory=list)
+    latest_ts: datetime | None = None
+
+    def __len__(self) -> int:
+        return len(self.statuses)
+
+    def append(self, row: dict[str, Any], ts: datetime) -> None:
+        self.statuses.append(sys.intern(str(row.get("status", "unknown"))))
+        self.timestamps.append(ts)
+        if self.latest_ts is None or ts > self.latest_ts:
+            self.latest_ts = ts
+        self.texts.append(str(row.get("text", "")).strip())
+        self.classes.append(sys.intern(traffic_class(row)))
+        self.has_trace.append(bool(str(row.get("trace_id", "")).strip()))
+
+
+def load_telegram_audit(path: Path, window: Window) -> TelegramColumns:
+    rows = TelegramColumns()
     if not path.exists():
-        return []
-    rows: list[dict[str, Any]] = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        if not line.strip():
-            continue
-        try:
-            payload = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        ts = parse_ts(str(payload.get("ts", "")))
-        if not ts:
-            continue
-        if ts < window.start or ts > window.end:
-            continue
-        rows.append(payload)
+        return rows
+    start_key = window.start.astimezone(timezone.utc).isoformat()
+    end_key = window.end.astimezone(timezone.utc).isoformat()
+    with path.open("rb") as handle:
+        if path.stat().st_size == 0:
+            return rows
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            mm.seek(audit_window_offset(mm, window.start))
+            for line in iter(mm.readline, b""):
+                if not line.strip():
+                    continue
+                try:
+                    payload = json_loads(line)
+                except json.JSONDecodeError:
+                    continue
+                raw_ts = str(payload.get("ts", ""))
+                # UTC ISO-8601 strings order like their instants, so rows
+                # outside the window are rejected without building a datetime.
+                if raw_ts.endswith("+00:00") and not start_key <= raw_ts <= end_key:
+                    continue
+                ts = parse_ts(raw_ts)
+                if not ts:
+                    continue
+                if ts < window.start or ts > window.end:
+                    continue
+                rows.append(payload, ts)
     return rows
 
 
+def command_tally_totals(tally: list[int]) -> tuple[int, int, int, int]:
+    ok = tally[STATUS_OK]
+    error = tally[STATUS_ERROR]
+    eligible = ok + error
+    return eligible + tally[STATUS_OTHER], eligible, ok, error
+
+
 def is_synthetic_telegram_row(row: dict[str, Any]) -> bool:
     cls = str(row.get("traffic_class", "")).strip().lower()
     if cls in {"synthetic_test", "synthetic_prodlike"}:
@@ -205,163 +550,93 @@ def traffic_class(row: dict[str, Any]) -> str:
 
 
 def summarize(
-    tasks: list[sqlite3.Row],
-    policy_events: list[sqlite3.Row],
-    approvals: list[sqlite3.Row],
-    review_events: list[sqlite3.Row],
-    telegram_rows: list[dict[str, Any]],
+    tasks: list[tuple[Any, ...]],
+    task_counts: list[tuple[Any, ...]],
+    telemetry: tuple[Any, ...],
+    policy_counts: list[tuple[Any, ...]],
+    approval_counts: list[tuple[Any, ...]],
+    approval_latency_minutes: list[float],
+    review_timelines: list[tuple[Any, ...]],
+    telegram: TelegramColumns,
 ) -> dict[str, Any]:
-    status_counts: dict[str, int] = {}
-    route_counts: dict[str, int] = {}
-    risk_counts: dict[str, int] = {}
-
-    dispatch_ms_values: list[float] = []
-    total_cost = 0.0
-    total_tokens = 0
-    compression_ratios: list[float] = []
-    cost_source_counts: dict[str, int] = {
-        "openrouter_api": 0,
-        "heuristic": 0,
-        "unknown": 0,
+    status_counts: Counter[str] = Counter()
+    route_counts: Counter[str] = Counter()
+    risk_counts: Counter[str] = Counter()
+    for status, route, risk, cnt in task_counts:
+        status_counts[status] += cnt
+        route_counts[route] += cnt
+        risk_counts[risk] += cnt
+
+    # Cost/token totals, compression average and cost sources are aggregated
+    # in SQL; only dispatch durations come back per task, for the p90.
+    dispatch_ms_values = array("d")
+    (
+        total_cost,
+        total_tokens,
+        avg_compression_ratio,
+        openrouter_api_count,
+        heuristic_count,
+        unknown_source_count,
+    ) = telemetry
+    cost_source_counts = {
+        "openrouter_api": openrouter_api_count,
+        "heuristic": heuristic_count,
+        "unknown": unknown_source_count,
     }
 
     heavy_task_count = 0
-    heavy_gate_pass = 0
-    heavy_gate_missing = 0
-    heavy_gate_fail = 0
-    review_reason_counts: dict[str, int] = {}
-    review_schema_complete_count = 0
+    present: list[tuple[str, str, bool]] = []
+    # Heavy tasks without a recorded review event fall back to reading
+    # reviewer.json from disk.
+    unrecorded_task_ids: list[str] = []
     review_fail_then_pass_count = 0
 
-    for row in tasks:
-        status = str(row["status"])
-        route = str(row["route_class"])
-        risk = str(row["risk_level"])
-        status_counts[status] = status_counts.get(status, 0) + 1
-        route_counts[route] = route_counts.get(route, 0) + 1
-        risk_counts[risk] = risk_counts.get(risk, 0) + 1
-
-        metadata = json.loads(row["metadata_json"] or "{}")
-        dispatch_ms = float(metadata.get("dispatch_duration_ms", 0) or 0)
+    for task_id, route, dispatch_ms, review_detail in tasks:
+        dispatch_ms = float(dispatch_ms or 0)
         if dispatch_ms > 0:
             dispatch_ms_values.append(dispatch_ms)
-        total_cost += float(metadata.get("estimated_cost_usd", 0.0) or 0.0)
-        total_tokens += int(metadata.get("estimated_total_tokens", 0) or 0)
-        ratio = float(metadata.get("compression_ratio", 0.0) or 0.0)
-        if ratio > 0:
-            compression_ratios.append(ratio)
-
-        cost_source = str(metadata.get("cost_source", "unknown") or "unknown")
-        if cost_source not in cost_source_counts:
-            cost_source = "unknown"
-        cost_source_counts[cost_source] += 1
-
         if route == "UBUNTU_HEAVY":
             heavy_task_count += 1
-            review_path = (
-                Path("storage/tasks") / str(row["task_id"]) / "artifacts/reviewer.json"
-            )
-            reviewer_status = "missing"
-            if review_path.exists():
-                try:
-                    payload = json.loads(review_path.read_text(encoding="utf-8"))
-                    reviewer_status = (
-                        str(payload.get("verdict", "missing")).lower().strip()
-                    )
-                    reason_code = str(payload.get("reason_code", "") or "")
-                    if reason_code:
-                        review_reason_counts[reason_code] = (
-                            review_reason_counts.get(reason_code, 0) + 1
-                        )
-                    checklist = payload.get("checklist", {})
-                    if isinstance(checklist, dict) and all(
-                        isinstance(checklist.get(k), bool)
-                        for k in (
-                            "policy_safety",
-                            "correctness",
-                            "tests",
-                            "rollback",
-                            "approval_constraints",
-                        )
-                    ):
-                        review_schema_complete_count += 1
-                except json.JSONDecodeError:
-                    reviewer_status = "invalid"
-            if reviewer_status == "pass":
-                heavy_gate_pass += 1
-            elif reviewer_status == "fail":
-                heavy_gate_fail += 1
+            review = parse_review_event(review_detail)
+            if review is None:
+                unrecorded_task_ids.append(task_id)
             else:
-                heavy_gate_missing += 1
-
-    policy_reason_counts: dict[str, int] = {}
-    for row in policy_events:
-        reason = parse_policy_reason(str(row["detail"]))
-        policy_reason_counts[reason] = policy_reason_counts.get(reason, 0) + 1
-
-    approval_status_counts: dict[str, int] = {}
-    approval_latency_minutes: list[float] = []
-    for row in approvals:
-        status = str(row["status"])
-        approval_status_counts[status] = approval_status_counts.get(status, 0) + 1
-        if status in {"approved", "rejected"}:
-            start = parse_ts(str(row["created_at"]))
-            end = parse_ts(str(row["updated_at"]))
-            if start and end and end >= start:
-                approval_latency_minutes.append((end - start).total_seconds() / 60.0)
-
-    pending_ts: dict[str, datetime] = {}
-    gate_latency_minutes: list[float] = []
-    review_timeline: dict[str, list[str]] = {}
-    for row in review_events:
-        task_id = str(row["task_id"])
-        detail = str(row["detail"])
-        ts = parse_ts(str(row["created_at"]))
-        if not ts:
-            continue
-        if detail.startswith("reviewer_artifact_recorded verdict="):
-            if "verdict=fail" in detail:
-                review_timeline.setdefault(task_id, []).append("fail")
-            elif "verdict=pass" in detail:
-                review_timeline.setdefault(task_id, []).append("pass")
-        if detail == "review_gate_pending":
-            pending_ts[task_id] = ts
-            continue
-        if (
-            detail.startswith("reviewer_artifact_recorded verdict=pass")
-            and task_id in pending_ts
-        ):
-            start = pending_ts[task_id]
-            if ts >= start:
-                gate_latency_minutes.append((ts - start).total_seconds() / 60.0)
-
-    for timeline in review_timeline.values():
-        if (
-            "fail" in timeline
-            and "pass" in timeline
-            and timeline.index("fail") < timeline.index("pass")
-        ):
+                present.append(review)
+
+    reviews = load_review_summaries(unrecorded_task_ids)
+    present.extend(review for review in reviews.values() if review is not None)
+    verdict_counts = Counter(review[0] for review in present)
+    heavy_gate_pass = verdict_counts["pass"]
+    heavy_gate_fail = verdict_counts["fail"]
+    heavy_gate_missing = heavy_task_count - heavy_gate_pass - heavy_gate_fail
+    review_reason_counts = Counter(review[1] for review in present if review[1])
+    review_schema_complete_count = sum(1 for review in present if review[2])
+
+    policy_block_count = 0
+    policy_reason_counts: Counter[str] = Counter()
+    for detail, cnt in policy_counts:
+        policy_reason_counts[parse_policy_reason(detail)] += cnt
+        policy_block_count += cnt
+
+    approval_status_counts = dict(approval_counts)
+
+    gate_latency_minutes = array("d")
+    for _task_id, first_fail, first_pass, gate_spans in review_timelines:
+        for pending_at, pass_at in json_loads(gate_spans):
+            minutes = minutes_between(pending_at, pass_at)
+            if minutes is not None:
+                gate_latency_minutes.append(minutes)
+        if first_fail and first_pass and first_fail < first_pass:
             review_fail_then_pass_count += 1
 
-    command_counts: dict[str, int] = {}
-    command_status_counts: dict[str, dict[str, int]] = {}
-    telegram_status_counts: dict[str, int] = {}
-    command_total = 0
-    command_eligible_total = 0
-    command_ok = 0
-    command_error = 0
-    production_command_total = 0
-    production_command_eligible_total = 0
-    production_command_ok = 0
-    production_command_error = 0
-    production_trace_command_total = 0
-    production_trace_command_eligible_total = 0
-    production_trace_command_ok = 0
-    production_trace_command_error = 0
-    prodlike_command_total = 0
-    prodlike_command_eligible_total = 0
-    prodlike_command_ok = 0
-    prodlike_command_error = 0
+    command_counts: Counter[str] = Counter()
+    command_status_counts: dict[str, Counter[str]] = {}
+    telegram_status_counts: Counter[str] = Counter()
+    # Command tallies per audience, indexed by status category.
+    command_tally = [0, 0, 0]
+    production_tally = [0, 0, 0]
+    production_trace_tally = [0, 0, 0]
+    prodlike_tally = [0, 0, 0]
     synthetic_count = 0
     recovery_window_minutes = 10
 
@@ -371,165 +646,142 @@ def summarize(
     poll_recovered_events: list[datetime] = []
     command_progress_events: list[datetime] = []
 
-    for row in telegram_rows:
-        status = str(row.get("status", "unknown"))
-        telegram_status_counts[status] = telegram_status_counts.get(status, 0) + 1
-        ts = parse_ts(str(row.get("ts", "")))
-        text = str(row.get("text", "")).strip()
-        cls = traffic_class(row)
+    # Per-row work is limited to building a compact group key and the
+    # incident timelines; the counters are then derived once per distinct
+    # (status, class, has_trace, command) group. Counter keeps first-seen
+    # order, so the reported dicts keep theirs too.
+    row_groups: Counter[tuple[str, str, bool, str | None]] = Counter()
+    for status, ts, text, cls, has_trace in zip(
+        telegram.statuses,
+        telegram.timestamps,
+        telegram.texts,
+        telegram.classes,
+        telegram.has_trace,
+    ):
         synthetic = cls != "real_operator"
-        if synthetic:
-            synthetic_count += 1
-        if ts and not synthetic:
+        is_command = text.startswith("/")
+        if not synthetic:
             if status == "command_timeout":
                 timeout_events.append(ts)
             elif status == "poll_error":
                 poll_error_events.append(ts)
             elif status == "poll_recovered":
                 poll_recovered_events.append(ts)
-            elif text.startswith("/") and status in {
-                "ok",
-                "idempotent_replay",
-                "user_error",
-                "error",
-            }:
+            elif is_command and status in PROGRESS_STATUSES:
                 command_progress_events.append(ts)
-        if text.startswith("/"):
-            command_total += 1
-            if status in {
-                "ok",
-                "idempotent_replay",
-                "error",
-                "command_timeout",
-                "idempotency_conflict",
-            }:
-                command_eligible_total += 1
-            if status in {"ok", "idempotent_replay"}:
-                command_ok += 1
-            elif status in {"error", "command_timeout", "idempotency_conflict"}:
-                command_error += 1
-
-            trace_id = str(row.get("trace_id", "")).strip()
-            has_trace = bool(trace_id)
-            if cls == "synthetic_prodlike":
-                prodlike_command_total += 1
-                if status in {
-                    "ok",
-                    "idempotent_replay",
-                    "error",
-                    "command_timeout",
-                    "idempotency_conflict",
-                }:
-                    prodlike_command_eligible_total += 1
-                if status in {"ok", "idempotent_replay"}:
-                    prodlike_command_ok += 1
-                elif status in {"error", "command_timeout", "idempotency_conflict"}:
-                    prodlike_command_error += 1
-            if not synthetic and has_trace and status == "command_timeout" and ts:
-                timeout_events_instrumented.append(ts)
-            if not synthetic:
-                production_command_total += 1
-                if status in {
-                    "ok",
-                    "idempotent_replay",
-                    "error",
-                    "command_timeout",
-                    "idempotency_conflict",
-                }:
-                    production_command_eligible_total += 1
-                if status in {"ok", "idempotent_replay"}:
-                    production_command_ok += 1
-                elif status in {"error", "command_timeout", "idempotency_conflict"}:
-                    production_command_error += 1
-
-            if not synthetic and has_trace:
-                production_trace_command_total += 1
-                if status in {
-                    "ok",
-                    "idempotent_replay",
-                    "error",
-                    "command_timeout",
-                    "idempotency_conflict",
-                }:
-                    production_trace_command_eligible_total += 1
-                if status in {"ok", "idempotent_replay"}:
-                    production_trace_command_ok += 1
-                elif status in {"error", "command_timeout", "idempotency_conflict"}:
-                    production_trace_command_error += 1
-
-            cmd = text.split()[0].split("@", 1)[0].lower()
-            command_counts[cmd] = command_counts.get(cmd, 0) + 1
-            cmd_bucket = command_status_counts.setdefault(cmd, {})
-            cmd_bucket[status] = cmd_bucket.get(status, 0) + 1
-
-    telegram_total = len(telegram_rows)
+        if not is_command:
+            row_groups[(status, cls, False, None)] += 1
+            continue
+        if not synthetic and has_trace and status == "command_timeout":
+            timeout_events_instrumented.append(ts)
+        cmd = COMMAND_RE.match(text).group().lower()
+        row_groups[(status, cls, has_trace, cmd)] += 1
+
+    for (status, cls, has_trace, cmd), n in row_groups.items():
+        telegram_status_counts[status] += n
+        synthetic = cls != "real_operator"
+        if synthetic:
+            synthetic_count += n
+        if cmd is None:
+            continue
+        category = COMMAND_STATUS_CATEGORY.get(status, STATUS_OTHER)
+        command_tally[category] += n
+        if cls == "synthetic_prodlike":
+            prodlike_tally[category] += n
+        if not synthetic:
+            production_tally[category] += n
+            if has_trace:
+                production_trace_tally[category] += n
+
+        command_counts[cmd] += n
+        command_status_counts.setdefault(cmd, Counter())[status] += n
+
+    command_total, command_eligible_total, command_ok, command_error = (
+        command_tally_totals(command_tally)
+    )
+    (
+        production_command_total,
+        production_command_eligible_total,
+        production_command_ok,
+        production_command_error,
+    ) = command_tally_totals(production_tally)
+    (
+        production_trace_command_total,
+        production_trace_command_eligible_total,
+        production_trace_command_ok,
+        production_trace_command_error,
+    ) = command_tally_totals(production_trace_tally)
+    (
+        prodlike_command_total,
+        prodlike_command_eligible_total,
+        prodlike_command_ok,
+        prodlike_command_error,
+    ) = command_tally_totals(prodlike_tally)
+
+    telegram_total = len(telegram)
     telegram_error = telegram_status_counts.get("error", 0)
     telegram_timeout = telegram_status_counts.get("command_timeout", 0)
     poll_error_count = telegram_status_counts.get("poll_error", 0)
     telegram_ok = telegram_status_counts.get("ok", 0)
 
+    timeout_events.sort()
+    timeout_events_instrumented.sort()
+    poll_error_events.sort()
     command_progress_events.sort()
     poll_recovered_events.sort()
 
+    def recovery_outcomes(
+        incidents: list[datetime], recovery_events: list[datetime]
+    ) -> list[float | None]:
+        # Minutes to recovery per incident, None when nothing recovered it
+        # within the window. recovery_events is sorted, so the first event
+        # after an incident is a bisect away and is the only candidate.
+        outcomes: list[float | None] = []
+        for incident_ts in incidents:
+            idx = bisect.bisect_right(recovery_events, incident_ts)
+            if idx == len(recovery_events):
+                outcomes.append(None)
+                continue
+            delta_m = (recovery_events[idx] - incident_ts).total_seconds() / 60.0
+            outcomes.append(delta_m if delta_m <= recovery_window_minutes else None)
+        return outcomes
+
     def incident_recovery(
-        incidents: list[datetime],
-        recovery_events: list[datetime],
-        min_incident_ts: datetime | None = None,
+        outcomes: list[float | None],
     ) -> tuple[int, int, list[float]]:
-        recovered = 0
-        latencies: list[float] = []
-        scoped_incidents = incidents
-        if min_incident_ts is not None:
-            scoped_incidents = [ts for ts in incidents if ts >= min_incident_ts]
-        for incident_ts in scoped_incidents:
-            recovery_ts: datetime | None = None
-            for event_ts in recovery_events:
-                if event_ts > incident_ts:
-                    delta_m = (event_ts - incident_ts).total_seconds() / 60.0
-                    if delta_m <= recovery_window_minutes:
-                        recovery_ts = event_ts
-                    break
-            if recovery_ts is not None:
-                recovered += 1
-                latencies.append((recovery_ts - incident_ts).total_seconds() / 60.0)
-        return len(scoped_incidents), recovered, latencies
+        latencies = [m for m in outcomes if m is not None]
+        return len(outcomes), len(latencies), latencies
 
-    timeout_total, timeout_recovered, timeout_latencies = incident_recovery(
-        timeout_events,
-        command_progress_events,
-    )
+    # Incidents are sorted, so the 24h and instrumented scopes are suffixes of
+    # the full outcome lists and reuse them instead of re-scanning.
     poll_recovery_candidates = (
         poll_recovered_events if poll_recovered_events else command_progress_events
     )
-    poll_total, poll_recovered, poll_latencies = incident_recovery(
-        poll_error_events,
-        poll_recovery_candidates,
+    timeout_outcomes = recovery_outcomes(timeout_events, command_progress_events)
+    poll_outcomes = recovery_outcomes(poll_error_events, poll_recovery_candidates)
+
+    timeout_total, timeout_recovered, timeout_latencies = incident_recovery(
+        timeout_outcomes
     )
+    poll_total, poll_recovered, poll_latencies = incident_recovery(poll_outcomes)
 
     all_recovery_latencies = timeout_latencies + poll_latencies
     total_incidents = timeout_total + poll_total
     recovered_incidents = timeout_recovered + poll_recovered
 
-    recent_cutoff: datetime | None = None
-    if telegram_rows:
-        ts_values: list[datetime] = []
-        for row in telegram_rows:
-            ts_val = parse_ts(str(row.get("ts", "")))
-            if ts_val:
-                ts_values.append(ts_val)
-        if ts_values:
-            recent_cutoff = max(ts_values) - timedelta(hours=24)
-
-    timeout_total_24h, timeout_recovered_24h, _ = incident_recovery(
-        timeout_events,
-        command_progress_events,
-        recent_cutoff,
-    )
-    poll_total_24h, poll_recovered_24h, _ = incident_recovery(
-        poll_error_events,
-        poll_recovery_candidates,
-        recent_cutoff,
-    )
+    timeout_recent = timeout_outcomes
+    poll_recent = poll_outcomes
+    if telegram.latest_ts is not None:
+        recent_cutoff = telegram.latest_ts - timedelta(hours=24)
+        timeout_recent = timeout_outcomes[
+            bisect.bisect_left(timeout_events, recent_cutoff) :
+        ]
+        poll_recent = poll_outcomes[
+            bisect.bisect_left(poll_error_events, recent_cutoff) :
+        ]
+
+    timeout_total_24h, timeout_recovered_24h, _ = incident_recovery(timeout_recent)
+    poll_total_24h, poll_recovered_24h, _ = incident_recovery(poll_recent)
     total_incidents_24h = timeout_total_24h + poll_total_24h
     recovered_incidents_24h = timeout_recovered_24h + poll_recovered_24h
     recovery_rate_24h = (
@@ -538,21 +790,18 @@ def summarize(
         else 1.0
     )
 
-    poll_error_events_instrumented: list[datetime] = []
+    # Poll recovery is only instrumented from the first poll_recovered event
+    # on; with any such event the full poll scan already used them.
+    poll_instr: list[float | None] = []
     if poll_recovered_events:
-        poll_instrumented_start = min(poll_recovered_events)
-        poll_error_events_instrumented = [
-            ts for ts in poll_error_events if ts >= poll_instrumented_start
+        poll_instr = poll_outcomes[
+            bisect.bisect_left(poll_error_events, poll_recovered_events[0]) :
         ]
 
     timeout_total_instr, timeout_recovered_instr, _ = incident_recovery(
-        timeout_events_instrumented,
-        command_progress_events,
-    )
-    poll_total_instr, poll_recovered_instr, _ = incident_recovery(
-        poll_error_events_instrumented,
-        poll_recovered_events,
+        recovery_outcomes(timeout_events_instrumented, command_progress_events)
     )
+    poll_total_instr, poll_recovered_instr, _ = incident_recovery(poll_instr)
     total_incidents_instr = timeout_total_instr + poll_total_instr
     recovered_incidents_instr = timeout_recovered_instr + poll_recovered_instr
     recovery_rate_instr = (
@@ -561,50 +810,39 @@ def summarize(
         else 1.0
     )
 
-    mttr_minutes = (
-        round(sum(all_recovery_latencies) / len(all_recovery_latencies), 2)
-        if all_recovery_latencies
-        else 0
-    )
-    p90_recovery_minutes = (
-        round(percentile(all_recovery_latencies, 0.90), 2)
-        if all_recovery_latencies
-        else 0
-    )
+    _, p90_recovery, mean_recovery = summary_stats(all_recovery_latencies)
+    mttr_minutes = round(mean_recovery, 2)
+    p90_recovery_minutes = round(p90_recovery, 2)
     recovery_rate = (
         round(recovered_incidents / total_incidents, 4) if total_incidents else 1.0
     )
 
+    approval_median, approval_p90, _ = summary_stats(approval_latency_minutes)
+    gate_median, gate_p90, _ = summary_stats(gate_latency_minutes)
+    _, dispatch_p90, dispatch_mean = summary_stats(dispatch_ms_values)
+
     return {
         "task_flow": {
             "task_count": len(tasks),
-            "status_counts": status_counts,
-            "route_counts": route_counts,
-            "risk_counts": risk_counts,
+            "status_counts": dict(status_counts),
+            "route_counts": dict(route_counts),
+            "risk_counts": dict(risk_counts),
         },
         "policy": {
-            "policy_block_count": len(policy_events),
-            "policy_reason_counts": policy_reason_counts,
+            "policy_block_count": policy_block_count,
+            "policy_reason_counts": dict(policy_reason_counts),
         },
         "approvals": {
             "approval_status_counts": approval_status_counts,
-            "median_approval_latency_minutes": round(
-                median(approval_latency_minutes), 2
-            )
-            if approval_latency_minutes
-            else 0,
-            "p90_approval_latency_minutes": round(
-                percentile(approval_latency_minutes, 0.90), 2
-            )
-            if approval_latency_minutes
-            else 0,
+            "median_approval_latency_minutes": round(approval_median, 2),
+            "p90_approval_latency_minutes": round(approval_p90, 2),
         },
         "review_gate": {
             "heavy_task_count": heavy_task_count,
             "gate_pass_count": heavy_gate_pass,
             "gate_fail_count": heavy_gate_fail,
             "gate_missing_count": heavy_gate_missing,
-            "review_reason_counts": review_reason_counts,
+            "review_reason_counts": dict(review_reason_counts),
             "review_schema_complete_count": review_schema_complete_count,
             "review_schema_complete_rate": round(
                 review_schema_complete_count / heavy_task_count, 4
@@ -615,38 +853,28 @@ def summarize(
             "gate_pass_rate": round(heavy_gate_pass / heavy_task_count, 4)
             if heavy_task_count
             else 0,
-            "median_gate_latency_minutes": round(median(gate_latency_minutes), 2)
-            if gate_latency_minutes
-            else 0,
-            "p90_gate_latency_minutes": round(percentile(gate_latency_minutes, 0.90), 2)
-            if gate_latency_minutes
-            else 0,
+            "median_gate_latency_minutes": round(gate_median, 2),
+            "p90_gate_latency_minutes": round(gate_p90, 2),
         },
         "telemetry": {
-            "avg_dispatch_duration_ms": round(
-                sum(dispatch_ms_values) / len(dispatch_ms_values), 2
-            )
-            if dispatch_ms_values
-            else 0,
-            "p90_dispatch_duration_ms": round(percentile(dispatch_ms_values, 0.90), 2)
-            if dispatch_ms_values
-            else 0,
+            "avg_dispatch_duration_ms": round(dispatch_mean, 2),
+            "p90_dispatch_duration_ms": round(dispatch_p90, 2),
             "avg_estimated_tokens": round(total_tokens / len(tasks), 2) if tasks else 0,
             "total_estimated_tokens": total_tokens,
             "total_estimated_cost_usd": round(total_cost, 6),
             "avg_estimated_cost_usd": round(total_cost / len(tasks), 6) if tasks else 0,
-            "avg_compression_ratio": round(
-                sum(compression_ratios) / len(compression_ratios), 4
-            )
-            if compression_ratios
+            "avg_compression_ratio": round(avg_compression_ratio, 4)
+            if avg_compression_ratio is not None
             else 0,
             "cost_source_counts": cost_source_counts,
         },
         "telegram": {
             "command_count": sum(command_counts.values()),
-            "command_counts": command_counts,
-            "command_status_counts": command_status_counts,
-            "status_counts": telegram_status_counts,
+            "command_counts": dict(command_counts),
+            "command_status_counts": {
+                cmd: dict(bucket) for cmd, bucket in command_status_counts.items()
+            },
+            "status_counts": dict(telegram_status_counts),
             "success_rate": round(telegram_ok / telegram_total, 4)
             if telegram_total
             else 0,
@@ -800,66 +1028,50 @@ def recommendations(summary: dict[str, Any]) -> list[str]:
 def render_markdown(
     iteration: str, window: Window, summary: dict[str, Any], actions: list[str]
 ) -> str:
-    lines: list[str] = []
-    lines.append(f"# ZHC-Nova Metrics Report - {iteration}")
-    lines.append("")
-    lines.append(f"- Generated: {utc_now().isoformat()}")
-    lines.append(f"- Window: {window.start.isoformat()} -> {window.end.isoformat()}")
-    lines.append("")
-
     flow = summary["task_flow"]
     policy = summary["policy"]
     approvals = summary["approvals"]
     gate = summary["review_gate"]
     telemetry = summary["telemetry"]
     telegram = summary["telegram"]
-
-    lines.append("## KPI Summary")
-    lines.append("")
-    lines.append(f"- Tasks: {flow['task_count']} (status: {flow['status_counts']})")
-    lines.append(
-        f"- Policy blocks: {policy['policy_block_count']} ({policy['policy_reason_counts']})"
-    )
-    lines.append(
-        f"- Approval latency: median={approvals['median_approval_latency_minutes']}m p90={approvals['p90_approval_latency_minutes']}m"
-    )
-    lines.append(
-        "- Review gate: "
-        f"pass_rate={gate['gate_pass_rate']} pass={gate['gate_pass_count']} fail={gate['gate_fail_count']} "
-        f"missing={gate['gate_missing_count']} schema_complete_rate={gate['review_schema_complete_rate']} "
-        f"fail_then_pass={gate['fail_then_pass_count']}"
-    )
-    lines.append(
-        f"- Telemetry: avg_dispatch_ms={telemetry['avg_dispatch_duration_ms']} total_cost_usd={telemetry['total_estimated_cost_usd']} total_tokens={telemetry['total_estimated_tokens']}"
-    )
-    lines.append(
-        "- Telegram: "
-        f"success_rate={telegram['success_rate']} error_rate={telegram['error_rate']} "
-        f"command_success_rate={telegram['command_success_rate']} "
-        f"prodlike_command_success_rate={telegram['prodlike_command_success_rate']} "
-        f"production_command_success_rate={telegram['production_command_success_rate']} "
-        f"production_trace_command_success_rate={telegram['production_trace_command_success_rate']} "
-        f"unauthorized={telegram['unauthorized_count']} poll_errors={telegram['poll_error_count']} "
-        f"timeouts={telegram['command_timeout_count']} synthetic_rows={telegram['synthetic_row_count']}"
-    )
     recovery = telegram["incident_recovery"]
-    lines.append(
-        "- Recovery: "
-        f"rate={recovery['recovery_rate']} mttr_minutes={recovery['mttr_minutes']} "
-        f"p90_recovery_minutes={recovery['p90_recovery_minutes']} "
-        f"incidents={recovery['total_incidents']} "
-        f"recent_24h_rate={recovery['recent_recovery_rate']} "
-        f"instrumented_rate={recovery['instrumented_recovery_rate']}"
-    )
-    lines.append("")
-
-    lines.append("## Top 5 Next Actions")
-    lines.append("")
-    for action in actions:
-        lines.append(f"- {action}")
-    lines.append("")
-    return "\n".join(lines) + "\n"
 
+    action_lines = "".join(f"- {action}\n" for action in actions)
+    return f"""# ZHC-Nova Metrics Report - {iteration}
+
+- Generated: {utc_now().isoformat()}
+- Window: {window.params[0]} -> {window.params[1]}
+
+## KPI Summary
+
+- Tasks: {flow['task_count']} (status: {flow['status_counts']})
+- Policy blocks: {policy['policy_block_count']} ({policy['policy_reason_counts']})
+- Approval latency: median={approvals['median_approval_latency_minutes']}m \
+p90={approvals['p90_approval_latency_minutes']}m
+- Review gate: pass_rate={gate['gate_pass_rate']} pass={gate['gate_pass_count']} \
+fail={gate['gate_fail_count']} missing={gate['gate_missing_count']} \
+schema_complete_rate={gate['review_schema_complete_rate']} \
+fail_then_pass={gate['fail_then_pass_count']}
+- Telemetry: avg_dispatch_ms={telemetry['avg_dispatch_duration_ms']} \
+total_cost_usd={telemetry['total_estimated_cost_usd']} \
+total_tokens={telemetry['total_estimated_tokens']}
+- Telegram: success_rate={telegram['success_rate']} error_rate={telegram['error_rate']} \
+command_success_rate={telegram['command_success_rate']} \
+prodlike_command_success_rate={telegram['prodlike_command_success_rate']} \
+production_command_success_rate={telegram['production_command_success_rate']} \
+production_trace_command_success_rate={telegram['production_trace_command_success_rate']} \
+unauthorized={telegram['unauthorized_count']} poll_errors={telegram['poll_error_count']} \
+timeouts={telegram['command_timeout_count']} synthetic_rows={telegram['synthetic_row_count']}
+- Recovery: rate={recovery['recovery_rate']} mttr_minutes={recovery['mttr_minutes']} \
+p90_recovery_minutes={recovery['p90_recovery_minutes']} \
+incidents={recovery['total_incidents']} \
+recent_24h_rate={recovery['recent_recovery_rate']} \
+instrumented_rate={recovery['instrumented_recovery_rate']}
+
+## Top 5 Next Actions
+
+{action_lines}
+"""
 
 def main() -> int:
     args = parse_args()
@@ -873,30 +1085,42 @@ def main() -> int:
     window = Window(start=start, end=end)
 
     with connect(db_path) as conn:
+        # One read transaction (one snapshot) serves every window query.
+        conn.execute("BEGIN")
         tasks = fetch_tasks(conn, window, args.limit_tasks)
-        policy_events = fetch_policy_block_events(conn, window)
-        approvals = fetch_approvals(conn, window)
-        review_events = fetch_review_events(conn, window)
-
-    telegram_rows = load_telegram_audit(audit_log_path, window)
-    summary = summarize(tasks, policy_events, approvals, review_events, telegram_rows)
+        task_counts = fetch_task_counts(conn, window, args.limit_tasks)
+        telemetry = fetch_telemetry_aggregates(conn, window, args.limit_tasks)
+        policy_counts = fetch_policy_block_counts(conn, window)
+        approval_counts = fetch_approval_counts(conn, window)
+        approval_latencies = fetch_approval_latencies(conn, window)
+        review_timelines = fetch_review_gate_timelines(conn, window)
+
+    telegram = load_telegram_audit(audit_log_path, window)
+    summary = summarize(
+        tasks,
+        task_counts,
+        telemetry,
+        policy_counts,
+        approval_counts,
+        approval_latencies,
+        review_timelines,
+        telegram,
+    )
     actions = recommendations(summary)
 
     payload = {
         "generated_at": utc_now().isoformat(),
         "iteration": args.iteration,
-        "window": {"start": window.start.isoformat(), "end": window.end.isoformat()},
+        "window": {"start": window.params[0], "end": window.params[1]},
         "summary": summary,
         "actions": actions,
     }
 
     output_json.parent.mkdir(parents=True, exist_ok=True)
     output_md.parent.mkdir(parents=True, exist_ok=True)
-    output_json.write_text(
-        json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8"
-    )
-    output_md.write_text(
-        render_markdown(args.iteration, window, summary, actions), encoding="utf-8"
+    output_json.write_bytes(json_dumps_pretty(payload))
+    output_md.write_bytes(
+        render_markdown(args.iteration, window, summary, actions).encode("utf-8")
     )
 
     print(f"Wrote metrics json: {output_json}")
@@ -9,13 +9,16 @@ real operator traffic exists yet.
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import os
-import runpy
+import re
 import time
 from pathlib import Path
 from typing import Any
 
+from script_common import json_loads, load_module
+
 
 ROOT = Path(__file__).resolve().parents[1]
 BOT_PATH = ROOT / "services/telegram-control/bot_longpoll.py"
@@ -31,7 +34,7 @@ def parse_args() -> argparse.Namespace:
         "--sleep-seconds",
         type=float,
         default=0.2,
-        help="Pause between cycles",
+        help="Pause between cycles (between cycle starts with --overlap-cycles)",
     )
     parser.add_argument(
         "--heavy-every",
@@ -54,52 +57,78 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Use real heavy execution path (default uses stub mode)",
     )
+    parser.add_argument(
+        "--overlap-cycles",
+        action="store_true",
+        help=(
+            "Start each cycle --sleep-seconds after the previous one starts "
+            "instead of after it finishes. Generates concurrent burst traffic, "
+            "not sequential operator-like commands; with --real-exec heavy runs "
+            "can overlap"
+        ),
+    )
     return parser.parse_args()
 
 
 def load_env_file(path: Path) -> None:
-    if not path.exists():
+    try:
+        handle = path.open(encoding="utf-8")
+    except FileNotFoundError:
         return
-    for raw in path.read_text(encoding="utf-8").splitlines():
-        line = raw.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        key = key.strip()
-        value = value.strip()
-        if not key:
-            continue
-        if (value.startswith('"') and value.endswith('"')) or (
-            value.startswith("'") and value.endswith("'")
-        ):
-            value = value[1:-1]
-        os.environ.setdefault(key, value)
-
-
-def read_audit(update_id: int) -> dict[str, Any] | None:
-    if not AUDIT_LOG.exists():
-        return None
+    with handle:
+        for raw in handle:
+            line = raw.strip()
+            if not line or line[0] == "#" or "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            key = key.strip()
+            value = value.strip()
+            if not key:
+                continue
+            # Only a matching pair of quotes is stripped.
+            if value and value[0] == value[-1] and value[0] in "\"'":
+                value = value[1:-1]
+            os.environ.setdefault(key, value)
+
+
+def load_bot_module() -> Any:
+    return load_module(BOT_PATH, "_zhc_bot_longpoll")
+
+
+def read_audit(update_id: int, offset: int = 0) -> tuple[dict[str, Any] | None, int]:
+    # The audit log is append-only, so callers pass the size they saw before
+    # triggering the command and only the bytes written since are scanned.
+    # Returns the last matching row and the offset to resume from.
+    try:
+        f = AUDIT_LOG.open("rb")
+    except FileNotFoundError:
+        return None, 0
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size < offset:  # truncated or rotated; rescan from the start
+            offset = 0
+        f.seek(offset)
+        data = f.read(size - offset)
+    pattern = re.compile(rb'^[^\n]*"update_id":\s*%d\b[^\n]*$' % update_id, re.M)
     match = None
-    for line in AUDIT_LOG.read_text(encoding="utf-8").splitlines():
-        if not line.strip():
-            continue
+    for found in pattern.finditer(data):
         try:
-            row = json.loads(line)
+            row = json_loads(found.group(0))
         except json.JSONDecodeError:
             continue
         if int(row.get("update_id", 0)) == update_id:
             match = row
-    return match
+    return match, offset + len(data)
 
 
 def main() -> int:
     args = parse_args()
     load_env_file(Path(args.env_file).resolve())
 
-    mod = runpy.run_path(str(BOT_PATH))
-    cfg = mod["load_config"]()
-    process_update = mod["process_update"]
-    process_update.__globals__["send_message"] = lambda config, chat_id, text: None
+    bot = load_bot_module()
+    cfg = bot.load_config()
+    process_update = bot.process_update
+    bot.send_message = lambda config, chat_id, text: None
 
     if not cfg.allowed_ids:
         raise RuntimeError("No TELEGRAM_ALLOWED_CHAT_IDS configured")
@@ -119,48 +148,75 @@ def main() -> int:
     command_count = 0
     heavy_runs = 0
 
-    def run_cmd(text: str) -> dict[str, Any]:
-        nonlocal update_id, command_count
-        command_count += 1
-        update_id += 1
-        update = {
-            "update_id": update_id,
+    async def run_cycle(cycle: int) -> None:
+        nonlocal heavy_runs
+        # Commands within a cycle depend on each other's task ids, so each
+        # cycle is one sequential chain with its own update template and
+        # audit offset; with --overlap-cycles only whole cycles overlap.
+        # process_update only reads the update, so the template is mutated in
+        # place per command.
+        message: dict[str, Any] = {
+            "chat": {"id": chat_id},
+            "from": {"id": chat_id, "username": "prodlike_runner"},
+            "text": "",
+        }
+        update: dict[str, Any] = {
+            "update_id": 0,
             "traffic_class": "synthetic_prodlike",
-            "message": {
-                "chat": {"id": chat_id},
-                "from": {"id": chat_id, "username": "prodlike_runner"},
-                "text": text,
-            },
+            "message": message,
         }
-        process_update(cfg, update, rate_buckets)
-        audit = read_audit(update_id) or {}
-        status = str(audit.get("status", "missing"))
-        status_counts[status] = status_counts.get(status, 0) + 1
-        return audit
-
-    started = time.time()
-    for cycle in range(1, max(1, args.cycles) + 1):
-        run_cmd("/ops")
-        run_cmd("/board")
-        ping = run_cmd(f"/newtask ping prodlike-cycle-{cycle}")
+        audit_offset = AUDIT_LOG.stat().st_size if AUDIT_LOG.exists() else 0
+
+        async def run_cmd(text: str) -> dict[str, Any]:
+            nonlocal update_id, command_count, audit_offset
+            command_count += 1
+            update_id += 1
+            cmd_update_id = update_id
+            update["update_id"] = cmd_update_id
+            message["text"] = text
+            await asyncio.to_thread(process_update, cfg, update, rate_buckets)
+            row, audit_offset = read_audit(cmd_update_id, audit_offset)
+            audit = row or {}
+            status = str(audit.get("status", "missing"))
+            status_counts[status] = status_counts.get(status, 0) + 1
+            return audit
+
+        await run_cmd("/ops")
+        await run_cmd("/board")
+        ping = await run_cmd(f"/newtask ping prodlike-cycle-{cycle}")
         ping_task = (ping.get("result") or {}).get("task_id", "")
         if ping_task:
-            run_cmd(f"/status {ping_task}")
+            await run_cmd(f"/status {ping_task}")
 
         if args.heavy_every > 0 and cycle % args.heavy_every == 0:
             heavy_runs += 1
-            heavy = run_cmd(f"/newtask code_refactor prodlike heavy cycle {cycle}")
+            heavy = await run_cmd(
+                f"/newtask code_refactor prodlike heavy cycle {cycle}"
+            )
             result = heavy.get("result") or {}
             task_id = str(result.get("task_id", ""))
             action = str(result.get("action_category", "supervised_heavy_execution"))
             if task_id:
-                run_cmd(f"/plan {task_id} prodlike plan cycle {cycle}")
-                run_cmd(f"/review {task_id} pass prodlike review cycle {cycle}")
-                run_cmd(f"/approve {task_id} {action} prodlike approve cycle {cycle}")
-                run_cmd(f"/resume {task_id}")
-                run_cmd(f"/status {task_id}")
+                await run_cmd(f"/plan {task_id} prodlike plan cycle {cycle}")
+                await run_cmd(f"/review {task_id} pass prodlike review cycle {cycle}")
+                await run_cmd(
+                    f"/approve {task_id} {action} prodlike approve cycle {cycle}"
+                )
+                await run_cmd(f"/resume {task_id}")
+                await run_cmd(f"/status {task_id}")
+
+    async def run_cycles() -> None:
+        pending = []
+        for cycle in range(1, max(1, args.cycles) + 1):
+            if args.overlap_cycles:
+                pending.append(asyncio.create_task(run_cycle(cycle)))
+            else:
+                await run_cycle(cycle)
+            await asyncio.sleep(max(0.0, args.sleep_seconds))
+        await asyncio.gather(*pending)
 
-        time.sleep(max(0.0, args.sleep_seconds))
+    started = time.time()
+    asyncio.run(run_cycles())
 
     summary = {
         "ok": True,
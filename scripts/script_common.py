@@ -0,0 +1,118 @@
+"""Helpers shared by the ZHC-Nova scripts.
+
+Imported by sibling scripts, which run with scripts/ on sys.path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import importlib.util
+import json
+import subprocess
+import sys
+import types
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+
+GATEWAY_HOST = "127.0.0.1"
+GATEWAY_PORT = 3131
+SERVICE_UNITS = ("zeroclaw-gateway.service", "zhc-telegram-control.service")
+# A single `show` reports every unit's ActiveState without is-active's
+# per-unit handling or the pager probe.
+UNIT_STATE_COMMAND = [
+    "systemctl",
+    "--user",
+    "show",
+    "--property=ActiveState",
+    "--value",
+    "--no-pager",
+    *SERVICE_UNITS,
+]
+
+
+def json_loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=True).encode("utf-8")
+
+
+def json_dumps_pretty(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+    return json.dumps(payload, indent=2, sort_keys=True).encode("utf-8")
+
+
+def load_module(path: Path, name: str) -> types.ModuleType:
+    # A real import (rather than runpy) lets the module's bytecode come from
+    # __pycache__ on repeat runs.
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"cannot load module: {path}")
+    mod = importlib.util.module_from_spec(spec)
+    # dataclasses resolve string annotations through sys.modules.
+    sys.modules[name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def unit_states() -> tuple[bool, list[str], str]:
+    proc = subprocess.run(UNIT_STATE_COMMAND, capture_output=True, timeout=20)
+    # One ActiveState word per unit; units are separated by blank lines.
+    states = [s.decode("utf-8", "replace") for s in proc.stdout.split()]
+    ok = (
+        proc.returncode == 0
+        and len(states) == len(SERVICE_UNITS)
+        and all(s == "active" for s in states)
+    )
+    return ok, states, proc.stderr.strip().decode("utf-8", "replace")
+
+
+def gateway_health() -> tuple[dict[str, Any], str]:
+    conn = http.client.HTTPConnection(GATEWAY_HOST, GATEWAY_PORT, timeout=20)
+    try:
+        conn.request("GET", "/health")
+        body = conn.getresponse().read().strip()
+    except (OSError, http.client.HTTPException) as exc:
+        return {}, str(exc)
+    finally:
+        conn.close()
+    if not body:
+        return {}, ""
+    try:
+        return json_loads(body), ""
+    except json.JSONDecodeError:
+        return {"raw": body.decode("utf-8", errors="replace")}, ""
+
+
+async def _service_health_async() -> dict[str, Any]:
+    (services_ok, states, services_error), (payload, gateway_error) = (
+        await asyncio.gather(
+            asyncio.to_thread(unit_states), asyncio.to_thread(gateway_health)
+        )
+    )
+    return {
+        "services_ok": services_ok,
+        "service_states": states,
+        "services_error": services_error,
+        "gateway_ok": payload.get("status") == "ok",
+        "gateway_health": payload,
+        "gateway_error": gateway_error,
+    }
+
+
+def service_health() -> dict[str, Any]:
+    # systemctl and the gateway probe are independent; overlap their latency.
+    return asyncio.run(_service_health_async())
@@ -11,29 +11,37 @@ Runs a short, deterministic sequence (typically 2-6 minutes) that validates:
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import os
-import runpy
-import subprocess
+import re
+import sys
 import time
-from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+from script_common import (
+    json_dumps_pretty,
+    json_loads,
+    load_module,
+    service_health,
+)
+
 
 ROOT = Path(__file__).resolve().parents[1]
 AUDIT_LOG = ROOT / "storage/memory/telegram_command_audit.jsonl"
 REGISTRY = ROOT / "shared/task-registry/task_registry.py"
 BOT_PATH = ROOT / "services/telegram-control/bot_longpoll.py"
+DISPATCH_EVENT_PREFIX = "single_node_local_run"
+# KEY=VALUE lines; blank lines, comments and lines without a key never
+# match. Key and value come back with surrounding whitespace trimmed.
+ENV_LINE_RE = re.compile(
+    r"^[^\S\n]*([^#=\s][^=\n]*?)[^\S\n]*=[^\S\n]*(.*?)[^\S\n]*$", re.M
+)
+AUDIT_SCAN_CHUNK = 65536
 
-
-@dataclass
-class StepResult:
-    command: str
-    update_id: int
-    status: str
-    error: str | None
-    result: dict[str, Any] | None
+# Audit log size at the previous read_audit_rows call.
+_audit_scanned_size = 0
 
 
 def parse_args() -> argparse.Namespace:
@@ -68,117 +76,94 @@ def parse_args() -> argparse.Namespace:
 
 
 def load_env_file(path: Path) -> None:
-    if not path.exists():
+    try:
+        text = path.read_text(encoding="utf-8")
+    except FileNotFoundError:
         return
-    for raw in path.read_text(encoding="utf-8").splitlines():
-        line = raw.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        key = key.strip()
-        if not key:
-            continue
-        value = value.strip()
-        if (value.startswith('"') and value.endswith('"')) or (
-            value.startswith("'") and value.endswith("'")
-        ):
+    setdefault = os.environ.setdefault
+    for key, value in map(re.Match.groups, ENV_LINE_RE.finditer(text)):
+        # Only a matching pair of quotes is stripped.
+        if value and value[0] == value[-1] and value[0] in "\"'":
             value = value[1:-1]
-        os.environ.setdefault(key, value)
-
-
-def run_shell(command: list[str], timeout: int = 20) -> tuple[int, str, str]:
-    proc = subprocess.run(
-        command,
-        cwd=ROOT,
-        capture_output=True,
-        text=True,
-        timeout=timeout,
-    )
-    return proc.returncode, proc.stdout.strip(), proc.stderr.strip()
-
-
-def service_health() -> dict[str, Any]:
-    code, out, err = run_shell(
-        [
-            "systemctl",
-            "--user",
-            "is-active",
-            "zeroclaw-gateway.service",
-            "zhc-telegram-control.service",
-        ],
-        timeout=20,
-    )
-    states = [s.strip() for s in out.splitlines() if s.strip()]
-    services_ok = code == 0 and len(states) == 2 and all(s == "active" for s in states)
-
-    code2, out2, err2 = run_shell(
-        ["curl", "-sS", "http://127.0.0.1:3131/health"], timeout=20
-    )
-    health_payload: dict[str, Any] = {}
-    if code2 == 0 and out2:
-        try:
-            health_payload = json.loads(out2)
-        except json.JSONDecodeError:
-            health_payload = {"raw": out2}
-
-    gateway_ok = bool(health_payload.get("status") == "ok")
-
-    return {
-        "services_ok": services_ok,
-        "service_states": states,
-        "services_error": err,
-        "gateway_ok": gateway_ok,
-        "gateway_health": health_payload,
-        "gateway_error": err2,
-    }
+        setdefault(key, value)
+
+
+def read_audit_rows(update_ids: set[int]) -> dict[int, dict[str, Any]]:
+    # The audit log is append-only and the rows we want were just written, so
+    # scan backwards from the end in chunks and keep the first (latest) row
+    # per update_id, stopping once all are found. Rows for ids not looked up
+    # yet can only appear past the size seen on the previous call, so the
+    # scan never goes below it.
+    global _audit_scanned_size
+    found: dict[int, dict[str, Any]] = {}
+    try:
+        f = AUDIT_LOG.open("rb")
+    except FileNotFoundError:
+        return found
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        floor = _audit_scanned_size if _audit_scanned_size <= size else 0
+        _audit_scanned_size = size
+        needles = [str(update_id).encode("ascii") for update_id in update_ids]
+        pos = size
+        carry = b""
+        while pos > floor and len(found) < len(update_ids):
+            start = max(floor, pos - AUDIT_SCAN_CHUNK)
+            f.seek(start)
+            lines = (f.read(pos - start) + carry).split(b"\n")
+            # The first piece may be the tail of a line that starts in the
+            # next chunk down; hold it back until that chunk is read.
+            carry = lines.pop(0) if start > floor else b""
+            for line in reversed(lines):
+                if not any(needle in line for needle in needles):
+                    continue
+                try:
+                    row = json_loads(line)
+                except ValueError:
+                    continue
+                update_id = int(row.get("update_id", 0))
+                if update_id in update_ids and update_id not in found:
+                    found[update_id] = row
+            pos = start
+    return found
+
+
+@functools.lru_cache(maxsize=1)
+def load_bot_module() -> Any:
+    # Imported once per process, so repeat sequences reuse it.
+    mod = load_module(BOT_PATH, "_zhc_bot_longpoll")
+    # never send real Telegram replies during harness run
+    mod.send_message = lambda config, chat_id, text: None
+    return mod
 
 
-def read_audit_by_update(update_id: int) -> dict[str, Any] | None:
-    if not AUDIT_LOG.exists():
-        return None
-    match: dict[str, Any] | None = None
-    for line in AUDIT_LOG.read_text(encoding="utf-8").splitlines():
-        if not line.strip():
-            continue
-        try:
-            row = json.loads(line)
-        except json.JSONDecodeError:
-            continue
-        if int(row.get("update_id", 0)) == update_id:
-            match = row
-    return match
-
-
-def get_task(task_id: str) -> dict[str, Any]:
-    code, out, err = run_shell(
-        ["python3", str(REGISTRY), "--json", "get", "--task-id", task_id], timeout=30
+def count_dispatch_events(events: list[dict[str, Any]]) -> int:
+    return sum(
+        1
+        for event in events
+        if (event.get("detail") or "").startswith(DISPATCH_EVENT_PREFIX)
     )
-    if code != 0:
-        raise RuntimeError(f"registry_get_failed: {err or out}")
-    return json.loads(out)
 
 
-def count_dispatch_events(task: dict[str, Any]) -> int:
-    count = 0
-    for ev in task.get("events", []):
-        detail = str(ev.get("detail", ""))
-        if detail.startswith("single_node_local_run"):
-            count += 1
-    return count
+def read_task_snapshot(registry: Any, task_id: str) -> tuple[str, int]:
+    # Task status and dispatch event count through the registry's own query
+    # API, so the smoke test follows schema changes.
+    try:
+        task = registry.get_task(registry.default_db_path(), task_id)
+    except KeyError as exc:
+        raise RuntimeError(f"registry_get_failed: {exc.args[0]}") from exc
+    return str(task["status"]), count_dispatch_events(task["events"])
 
 
 def run_sequence(real_exec: bool) -> dict[str, Any]:
     if not real_exec:
         os.environ["ZHC_ENABLE_REAL_OPENCODE"] = "0"
 
-    mod = runpy.run_path(str(BOT_PATH))
-    load_config = mod["load_config"]
-    process_update = mod["process_update"]
-
-    # never send real Telegram replies during harness run
-    mod["send_message"] = lambda config, chat_id, text: None
+    bot = load_bot_module()
+    registry = load_module(REGISTRY, "_zhc_task_registry")
+    process_update = bot.process_update
 
-    cfg = load_config()
+    cfg = bot.load_config()
     if not cfg.allowed_ids:
         raise RuntimeError("No TELEGRAM_ALLOWED_CHAT_IDS configured")
     # Disable the per-chat limiter so the harness can fire commands in a tight loop.
@@ -189,77 +174,95 @@ def run_sequence(real_exec: bool) -> dict[str, Any]:
     now = int(time.time())
     update_id = 910000000 + (now % 1000000)
     rate_buckets: dict[int, list[float]] = {}
-    steps: list[StepResult] = []
+    # Steps are kept in the shape the summary reports; the audit result
+    # payloads they need are held separately by update_id.
+    steps: list[dict[str, Any]] = []
+    step_results: dict[int, dict[str, Any]] = {}
+    unresolved: list[dict[str, Any]] = []
+
+    # process_update only reads the update, so one template is reused and
+    # just the id and text change per command.
+    message: dict[str, Any] = {
+        "chat": {"id": chat_id},
+        "from": {"id": chat_id, "username": "fast_smoke"},
+        "text": "",
+    }
+    update: dict[str, Any] = {"update_id": 0, "message": message}
 
-    def run_cmd(text: str) -> StepResult:
+    def run_cmd(text: str) -> dict[str, Any]:
+        # The audit outcome is filled in later by resolve_steps, so steps
+        # whose result is not needed right away share one audit scan.
         nonlocal update_id
         update_id += 1
-        update = {
+        update["update_id"] = update_id
+        message["text"] = text
+        process_update(cfg, update, rate_buckets)
+        step: dict[str, Any] = {
+            "command": text,
             "update_id": update_id,
-            "message": {
-                "chat": {"id": chat_id},
-                "from": {"id": chat_id, "username": "fast_smoke"},
-                "text": text,
-            },
+            "status": "missing",
+            "error": None,
         }
-        process_update(cfg, update, rate_buckets)
-        audit = read_audit_by_update(update_id) or {}
-        step = StepResult(
-            command=text,
-            update_id=update_id,
-            status=str(audit.get("status", "missing")),
-            error=audit.get("error"),
-            result=audit.get("result")
-            if isinstance(audit.get("result"), dict)
-            else None,
-        )
         steps.append(step)
+        unresolved.append(step)
         return step
 
+    def resolve_steps() -> None:
+        rows = read_audit_rows({step["update_id"] for step in unresolved})
+        for step in unresolved:
+            audit = rows.get(step["update_id"], {})
+            step["status"] = str(audit.get("status", "missing"))
+            step["error"] = audit.get("error")
+            result = audit.get("result")
+            if isinstance(result, dict):
+                step_results[step["update_id"]] = result
+        unresolved.clear()
+
     suffix = f"fast-{now}"
     create = run_cmd(f"/newtask code_refactor fast smoke {suffix}")
-    task_id = (create.result or {}).get("task_id", "")
-    action = (create.result or {}).get("action_category", "supervised_heavy_execution")
+    resolve_steps()
+    created = step_results.get(create["update_id"], {})
+    task_id = created.get("task_id", "")
+    action = created.get("action_category", "supervised_heavy_execution")
     if not task_id:
         raise RuntimeError("Failed to create heavy smoke task")
 
+    def snapshot() -> tuple[str, int]:
+        return read_task_snapshot(registry, task_id)
+
     run_cmd(f"/plan {task_id} fast smoke plan")
     run_cmd(f"/review {task_id} pass fast smoke review")
 
-    before_approve = get_task(task_id)
-    dispatch_before_approve = count_dispatch_events(before_approve)
+    _, dispatch_before_approve = snapshot()
     approve1 = run_cmd(f"/approve {task_id} {action} fast smoke approve one")
-    after_approve1 = get_task(task_id)
-    dispatch_after_approve1 = count_dispatch_events(after_approve1)
+    _, dispatch_after_approve1 = snapshot()
     approve2 = run_cmd(f"/approve {task_id} {action} fast smoke approve duplicate")
-    after_approve2 = get_task(task_id)
-    dispatch_after_approve2 = count_dispatch_events(after_approve2)
+    status_after_approve2, dispatch_after_approve2 = snapshot()
 
     resume1 = run_cmd(f"/resume {task_id}")
-    after_resume1 = get_task(task_id)
-    dispatch_after_resume1 = count_dispatch_events(after_resume1)
+    status_after_resume1, dispatch_after_resume1 = snapshot()
     resume2 = run_cmd(f"/resume {task_id}")
-    after_resume2 = get_task(task_id)
-    dispatch_after_resume2 = count_dispatch_events(after_resume2)
+    status_after_resume2, dispatch_after_resume2 = snapshot()
+    resolve_steps()
 
     approve_record_only_ok = (
-        approve1.status == "ok"
-        and approve2.status == "ok"
+        approve1["status"] == "ok"
+        and approve2["status"] == "ok"
         and dispatch_after_approve1 == dispatch_before_approve
         and dispatch_after_approve2 == dispatch_before_approve
-        and after_approve2.get("status") == "blocked"
+        and status_after_approve2 == "blocked"
     )
 
     resume_executes_ok = (
-        resume1.status == "ok"
-        and after_resume1.get("status") == "succeeded"
+        resume1["status"] == "ok"
+        and status_after_resume1 == "succeeded"
         and dispatch_after_resume1 >= dispatch_before_approve + 1
     )
 
     duplicate_resume_safe = (
         dispatch_after_resume2 == dispatch_after_resume1
-        and (resume2.status in {"ok", "error"})
-        and after_resume2.get("status") == "succeeded"
+        and (resume2["status"] in {"ok", "error"})
+        and status_after_resume2 == "succeeded"
     )
 
     duplicate_execution_detected = dispatch_after_resume2 > dispatch_after_resume1
@@ -267,21 +270,14 @@ def run_sequence(real_exec: bool) -> dict[str, Any]:
     command_timeout_count = sum(
         1
         for s in steps
-        if s.status == "command_timeout" or (s.error and "command_timeout" in s.error)
+        if s["status"] == "command_timeout"
+        or (s["error"] and "command_timeout" in s["error"])
     )
 
     return {
         "chat_id": chat_id,
         "task_id": task_id,
-        "steps": [
-            {
-                "command": s.command,
-                "update_id": s.update_id,
-                "status": s.status,
-                "error": s.error,
-            }
-            for s in steps
-        ],
+        "steps": steps,
         "checks": {
             "approve_record_only": approve_record_only_ok,
             "resume_executes": resume_executes_ok,
@@ -295,16 +291,16 @@ def run_sequence(real_exec: bool) -> dict[str, Any]:
             "after_resume_1": dispatch_after_resume1,
             "after_resume_2": dispatch_after_resume2,
         },
-        "final_task_status": after_resume2.get("status"),
+        "final_task_status": status_after_resume2,
         "timeouts": command_timeout_count,
         "approve_messages": {
-            "first": (approve1.result or {}).get("message"),
-            "second": (approve2.result or {}).get("message"),
+            "first": step_results.get(approve1["update_id"], {}).get("message"),
+            "second": step_results.get(approve2["update_id"], {}).get("message"),
         },
         "resume_statuses": {
-            "first": resume1.status,
-            "second": resume2.status,
-            "second_error": resume2.error,
+            "first": resume1["status"],
+            "second": resume2["status"],
+            "second_error": resume2["error"],
         },
     }
 
@@ -347,17 +343,19 @@ def main() -> int:
         "result": sequence,
     }
 
+    pretty = b""
+    if args.output or not args.json:
+        pretty = json_dumps_pretty(summary)
+
     if args.output:
         out_path = Path(args.output).resolve()
         out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(
-            json.dumps(summary, indent=2, sort_keys=True), encoding="utf-8"
-        )
+        out_path.write_bytes(pretty)
 
     if args.json:
         print(json.dumps(summary, ensure_ascii=True))
     else:
-        print(json.dumps(summary, indent=2, sort_keys=True))
+        sys.stdout.buffer.write(pretty + b"\n")
 
     return 0 if passed else 1
 
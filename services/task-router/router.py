@@ -9,11 +9,15 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import functools
 import hashlib
+import importlib.util
 import json
 import os
 import random
 import socket
+import sqlite3
 import subprocess
 import sys
 import time
@@ -23,9 +27,14 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
 
-VALID_AUTONOMY_MODES = {"readonly", "supervised", "auto"}
-VALID_RUNTIME_MODES = {"single_node", "multi_node"}
+
+VALID_AUTONOMY_MODES = frozenset({"readonly", "supervised", "auto"})
+VALID_RUNTIME_MODES = frozenset({"single_node", "multi_node"})
 VALID_REVIEW_FAIL_CODES = {
     "policy_conflict",
     "missing_tests",
@@ -41,8 +50,38 @@ REVIEW_CHECKLIST_KEYS = (
     "rollback",
     "approval_constraints",
 )
+# Approval gate guarding each sensitive task type.
+_GATE_BY_TASK_TYPE = {
+    "deploy": "deploy_restart",
+    "delete": "delete_files",
+    "scheduler_change": "scheduler_change",
+    "compliance_finalize": "compliance_finalize",
+    "customer_outbound": "customer_outbound",
+    "browser_pilot": "browser_sensitive",
+}
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+_REGISTRY_PY = _REPO_ROOT / "shared/task-registry/task_registry.py"
+_DEFAULT_DB = _REPO_ROOT / "storage/tasks/task_registry.db"
+_DEFAULT_STORAGE = _REPO_ROOT / "storage"
+_ROUTING_POLICY = _REPO_ROOT / "shared/policies/routing.yaml"
+_APPROVAL_POLICY = _REPO_ROOT / "shared/policies/approvals.yaml"
+_EXECUTION_POLICY = _REPO_ROOT / "shared/policies/execution_policy.yaml"
+_ZRUN = _REPO_ROOT / "infra/opencode/wrappers/zrun.sh"
+_ZDISPATCH = _REPO_ROOT / "infra/opencode/wrappers/zdispatch.sh"
+_ZBROWSER_SAFE = _REPO_ROOT / "infra/browser/wrappers/zbrowser_safe.sh"
+
+# Whole OpenRouter price list from one /models fetch, refreshed after
+# ZHC_COST_LOOKUP_TTL_SECONDS. A failed fetch caches an empty table so lookups
+# don't retry the request on every task.
+_OPENROUTER_PRICE_TABLE: dict[str, tuple[float, float] | None] | None = None
+_OPENROUTER_PRICE_FETCHED_AT = 0.0
 
-_OPENROUTER_PRICE_CACHE: dict[str, tuple[float, float] | None] = {}
+
+def json_loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 def utc_now() -> str:
@@ -50,7 +89,7 @@ def utc_now() -> str:
 
 
 def repo_root() -> Path:
-    return Path(__file__).resolve().parents[2]
+    return _REPO_ROOT
 
 
 def load_policy(path: Path) -> dict[str, Any]:
@@ -66,8 +105,47 @@ def load_policy(path: Path) -> dict[str, Any]:
         return {}
 
 
+def load_policy_with_terms(path: Path) -> tuple[dict[str, Any], dict[str, Any]]:
+    policy = load_policy(path)
+    return policy, policy_terms(policy if isinstance(policy, dict) else {})
+
+
+def policy_terms(policy: dict[str, Any]) -> dict[str, Any]:
+    # Match terms derived once per policy parse so classify and
+    # evaluate_execution_policy don't re-lower them on every request.
+    rules = policy.get("keyword_rules", {})
+    allowlists = policy.get("allowlists", {})
+    deny_rules = policy.get("deny_rules", {})
+    return {
+        # Empty keywords are kept here: "" matches every prompt in classify.
+        "heavy": tuple(k.lower() for k in rules.get("ubuntu_heavy", [])),
+        "high_risk": tuple(k.lower() for k in rules.get("high_risk", [])),
+        "pi_light_allow": frozenset(
+            str(v).lower() for v in allowlists.get("pi_light_task_types", [])
+        ),
+        "ubuntu_heavy_allow": frozenset(
+            str(v).lower() for v in allowlists.get("ubuntu_heavy_task_types", [])
+        ),
+        "blocked_keywords": tuple(
+            kw
+            for kw in (
+                str(v).lower() for v in deny_rules.get("blocked_prompt_keywords", [])
+            )
+            if kw
+        ),
+        "blocked_paths": tuple(
+            path
+            for path in (str(v) for v in deny_rules.get("blocked_path_patterns", []))
+            if path
+        ),
+    }
+
+
 def classify(
-    task_type: str, prompt: str, routing_policy: dict[str, Any]
+    task_type: str,
+    prompt: str,
+    routing_policy: dict[str, Any],
+    terms: dict[str, Any] | None = None,
 ) -> tuple[str, str]:
     task_type_l = task_type.lower().strip()
     prompt_l = prompt.lower()
@@ -82,14 +160,12 @@ def classify(
         route_class = cfg.get("route_class", route_class)
         risk_level = cfg.get("risk_level", risk_level)
 
-    rules = routing_policy.get("keyword_rules", {})
-    heavy_keywords = [k.lower() for k in rules.get("ubuntu_heavy", [])]
-    high_risk_keywords = [k.lower() for k in rules.get("high_risk", [])]
-
-    if any(word in prompt_l for word in heavy_keywords):
+    if terms is None:
+        terms = policy_terms(routing_policy)
+    if any(word in prompt_l for word in terms["heavy"]):
         route_class = "UBUNTU_HEAVY"
 
-    if any(word in prompt_l for word in high_risk_keywords):
+    if any(word in prompt_l for word in terms["high_risk"]):
         risk_level = "high"
 
     return route_class, risk_level
@@ -102,15 +178,7 @@ def requires_approval(
         return True
 
     gates = approval_policy.get("gates", {})
-    gate_by_task_type = {
-        "deploy": "deploy_restart",
-        "delete": "delete_files",
-        "scheduler_change": "scheduler_change",
-        "compliance_finalize": "compliance_finalize",
-        "customer_outbound": "customer_outbound",
-        "browser_pilot": "browser_sensitive",
-    }
-    gate_name = gate_by_task_type.get(task_type.lower())
+    gate_name = _GATE_BY_TASK_TYPE.get(task_type.lower())
     if not gate_name:
         return False
 
@@ -118,36 +186,50 @@ def requires_approval(
 
 
 def action_category_for_task(task_type: str, risk_level: str) -> str:
-    gate_by_task_type = {
-        "deploy": "deploy_restart",
-        "delete": "delete_files",
-        "scheduler_change": "scheduler_change",
-        "compliance_finalize": "compliance_finalize",
-        "customer_outbound": "customer_outbound",
-        "browser_pilot": "browser_sensitive",
-    }
-    task_type_l = task_type.lower().strip()
-    if task_type_l in gate_by_task_type:
-        return gate_by_task_type[task_type_l]
+    gate_name = _GATE_BY_TASK_TYPE.get(task_type.lower().strip())
+    if gate_name:
+        return gate_name
     if risk_level == "high":
         return "manual_review"
     return "none"
 
 
-def autonomy_mode() -> str:
-    mode = os.getenv("ZHC_AUTONOMY_MODE", "supervised").strip().lower()
-    if mode not in VALID_AUTONOMY_MODES:
-        allowed = ", ".join(sorted(VALID_AUTONOMY_MODES))
-        raise ValueError(f"Invalid ZHC_AUTONOMY_MODE '{mode}'. Allowed: {allowed}")
+def _parse_mode(raw: str, env_name: str, allowed_modes: frozenset[str]) -> str:
+    mode = raw.strip().lower()
+    if mode not in allowed_modes:
+        allowed = ", ".join(sorted(allowed_modes))
+        raise ValueError(f"Invalid {env_name} '{mode}'. Allowed: {allowed}")
     return mode
 
 
+def _parse_int(raw: str, default: int, minimum: int) -> int:
+    try:
+        return max(minimum, int(raw.strip()))
+    except ValueError:
+        return default
+
+
+def _parse_float(raw: str, default: float, minimum: float) -> float:
+    try:
+        return max(minimum, float(raw.strip()))
+    except ValueError:
+        return default
+
+
+def autonomy_mode() -> str:
+    return _parse_mode(
+        os.getenv("ZHC_AUTONOMY_MODE", "supervised"),
+        "ZHC_AUTONOMY_MODE",
+        VALID_AUTONOMY_MODES,
+    )
+
+
 def runtime_mode() -> str:
-    mode = os.getenv("ZHC_RUNTIME_MODE", "single_node").strip().lower()
-    if mode not in VALID_RUNTIME_MODES:
-        allowed = ", ".join(sorted(VALID_RUNTIME_MODES))
-        raise ValueError(f"Invalid ZHC_RUNTIME_MODE '{mode}'. Allowed: {allowed}")
-    return mode
+    return _parse_mode(
+        os.getenv("ZHC_RUNTIME_MODE", "single_node"),
+        "ZHC_RUNTIME_MODE",
+        VALID_RUNTIME_MODES,
+    )
 
 
 def dispatch_owner_id() -> str:
@@ -158,43 +240,27 @@ def dispatch_owner_id() -> str:
 
 
 def dispatch_lease_seconds() -> int:
-    raw = os.getenv("ZHC_DISPATCH_LEASE_SECONDS", "120").strip()
-    try:
-        return max(30, int(raw))
-    except ValueError:
-        return 120
+    return _parse_int(os.getenv("ZHC_DISPATCH_LEASE_SECONDS", "120"), 120, 30)
 
 
 def dispatch_retry_max() -> int:
-    raw = os.getenv("ZHC_DISPATCH_RETRY_MAX", "1").strip()
-    try:
-        return max(0, int(raw))
-    except ValueError:
-        return 1
+    return _parse_int(os.getenv("ZHC_DISPATCH_RETRY_MAX", "1"), 1, 0)
 
 
 def dispatch_retry_backoff_seconds() -> float:
-    raw = os.getenv("ZHC_DISPATCH_RETRY_BACKOFF_SECONDS", "1.0").strip()
-    try:
-        return max(0.1, float(raw))
-    except ValueError:
-        return 1.0
+    return _parse_float(
+        os.getenv("ZHC_DISPATCH_RETRY_BACKOFF_SECONDS", "1.0"), 1.0, 0.1
+    )
 
 
 def dispatch_retry_jitter_seconds() -> float:
-    raw = os.getenv("ZHC_DISPATCH_RETRY_JITTER_SECONDS", "0.3").strip()
-    try:
-        return max(0.0, float(raw))
-    except ValueError:
-        return 0.3
+    return _parse_float(
+        os.getenv("ZHC_DISPATCH_RETRY_JITTER_SECONDS", "0.3"), 0.3, 0.0
+    )
 
 
 def dispatch_timeout_seconds() -> int:
-    raw = os.getenv("ZHC_DISPATCH_TIMEOUT_SECONDS", "900").strip()
-    try:
-        return max(30, int(raw))
-    except ValueError:
-        return 900
+    return _parse_int(os.getenv("ZHC_DISPATCH_TIMEOUT_SECONDS", "900"), 900, 30)
 
 
 def payload_hash(payload: dict[str, Any]) -> str:
@@ -223,6 +289,7 @@ def evaluate_execution_policy(
     route_class: str,
     mode: str,
     execution_policy: dict[str, Any],
+    terms: dict[str, Any] | None = None,
 ) -> tuple[bool, str]:
     if mode == "readonly":
         return False, "readonly_mode"
@@ -235,15 +302,12 @@ def evaluate_execution_policy(
     if enforcement not in {"strict", "warn"}:
         enforcement = "strict"
 
-    allowlists = execution_policy.get("allowlists", {})
+    if terms is None:
+        terms = policy_terms(execution_policy)
     if route_class == "PI_LIGHT":
-        allowed_task_types = {
-            str(v).lower() for v in allowlists.get("pi_light_task_types", [])
-        }
+        allowed_task_types = terms["pi_light_allow"]
     else:
-        allowed_task_types = {
-            str(v).lower() for v in allowlists.get("ubuntu_heavy_task_types", [])
-        }
+        allowed_task_types = terms["ubuntu_heavy_allow"]
 
     task_type_l = task_type.lower().strip()
     if allowed_task_types and task_type_l not in allowed_task_types:
@@ -251,26 +315,53 @@ def evaluate_execution_policy(
             return False, "unknown_task_type"
 
     prompt_l = prompt.lower()
-    deny_rules = execution_policy.get("deny_rules", {})
-    blocked_keywords = [
-        str(v).lower() for v in deny_rules.get("blocked_prompt_keywords", [])
-    ]
-    if any(keyword and keyword in prompt_l for keyword in blocked_keywords):
+    if any(keyword in prompt_l for keyword in terms["blocked_keywords"]):
         if enforcement == "strict":
             return False, "blocked_prompt_keyword"
 
-    blocked_paths = [str(v) for v in deny_rules.get("blocked_path_patterns", [])]
-    if any(path and path in prompt for path in blocked_paths):
+    if any(path in prompt for path in terms["blocked_paths"]):
         if enforcement == "strict":
             return False, "blocked_path_pattern"
 
     return True, "allowed"
 
 
+@functools.lru_cache(maxsize=1)
+def _registry_module() -> Any:
+    # Router-specific name so it can't collide with other loaders of the
+    # registry in the same process (e.g. chaos_lite's _zhc_task_registry).
+    name = "_zhc_router_task_registry"
+    spec = importlib.util.spec_from_file_location(name, _REGISTRY_PY)
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"cannot load module: {_REGISTRY_PY}")
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
 def run_registry(args: list[str], db_path: Path) -> dict[str, Any]:
+    # Registry commands run in-process through the CLI's own parser, which
+    # saves an interpreter start per call. ZHC_REGISTRY_SUBPROCESS=1 restores
+    # the subprocess path.
+    if os.getenv("ZHC_REGISTRY_SUBPROCESS", "").strip() != "1":
+        registry = _registry_module()
+        try:
+            parsed = registry.parse_args(
+                ["--db", str(db_path), "--json", *args], exit_on_error=False
+            )
+        except argparse.ArgumentError as exc:
+            # Same usage/error text the CLI prints before exiting.
+            raise RuntimeError(str(exc)) from exc
+        try:
+            return registry.execute(parsed)
+        except Exception as exc:
+            # Same message the CLI prints to stderr on failure.
+            raise RuntimeError(f"ERROR: {exc}") from exc
+
     cmd = [
         sys.executable,
-        str(repo_root() / "shared/task-registry/task_registry.py"),
+        str(_REGISTRY_PY),
         "--db",
         str(db_path),
         "--json",
@@ -279,7 +370,7 @@ def run_registry(args: list[str], db_path: Path) -> dict[str, Any]:
     proc = subprocess.run(cmd, capture_output=True, text=True)
     if proc.returncode != 0:
         raise RuntimeError(proc.stderr.strip() or "registry command failed")
-    return json.loads(proc.stdout)
+    return json_loads(proc.stdout)
 
 
 def merge_task_metadata(
@@ -310,7 +401,11 @@ def model_hint_for_task(task_type: str) -> tuple[str, str]:
 
 
 def estimate_tokens(text: str) -> int:
-    return max(1, (len(text) + 3) // 4)
+    return estimate_tokens_for_chars(len(text))
+
+
+def estimate_tokens_for_chars(chars: int) -> int:
+    return max(1, (chars + 3) // 4)
 
 
 def compact_snippet(text: str, limit: int = 140) -> str:
@@ -352,22 +447,25 @@ def compact_text_to_token_budget(text: str, budget: int) -> tuple[str, int, int,
         elif line.strip():
             essential_lines.append(compact_snippet(line, 200))
 
+    # chars tracks len("\n".join(selected)) so the budget checks don't
+    # re-join the selection on every line.
     selected: list[str] = []
+    chars = 0
     for line in essential_lines:
+        chars += len(line) + (1 if selected else 0)
         selected.append(line)
-        if estimate_tokens("\n".join(selected)) >= effective_budget:
+        if estimate_tokens_for_chars(chars) >= effective_budget:
             break
 
-    if retrieval_lines and estimate_tokens("\n".join(selected)) < effective_budget:
+    if retrieval_lines and estimate_tokens_for_chars(chars) < effective_budget:
+        chars += len("retrieval:") + (1 if selected else 0)
         selected.append("retrieval:")
-        used = estimate_tokens("\n".join(selected))
         for line in retrieval_lines:
-            test = "\n".join(selected + [line])
-            next_tokens = estimate_tokens(test)
-            if next_tokens > effective_budget:
+            next_chars = chars + 1 + len(line)
+            if estimate_tokens_for_chars(next_chars) > effective_budget:
                 break
             selected.append(line)
-            used = next_tokens
+            chars = next_chars
 
     compacted = "\n".join(selected) if selected else compact_snippet(text, 400)
 
@@ -383,10 +481,8 @@ def compact_text_to_token_budget(text: str, budget: int) -> tuple[str, int, int,
 def recent_memory_snippets(
     db_path: Path, task_type: str, limit: int = 5
 ) -> list[dict[str, str]]:
-    import sqlite3
-
     snippets: list[dict[str, str]] = []
-    with sqlite3.connect(db_path) as conn:
+    with contextlib.closing(sqlite3.connect(db_path)) as conn:
         conn.row_factory = sqlite3.Row
         rows = conn.execute(
             """
@@ -399,7 +495,7 @@ def recent_memory_snippets(
             (task_type, limit),
         ).fetchall()
     for row in rows:
-        metadata = json.loads(row["metadata_json"] or "{}")
+        metadata = json_loads(row["metadata_json"] or "{}")
         snippets.append(
             {
                 "source": f"task:{row['task_id']}",
@@ -410,7 +506,7 @@ def recent_memory_snippets(
             }
         )
 
-    memory_dir = repo_root() / "storage" / "memory"
+    memory_dir = _DEFAULT_STORAGE / "memory"
     if memory_dir.exists():
         for path in sorted(
             memory_dir.glob("*.txt"), key=lambda p: p.stat().st_mtime, reverse=True
@@ -447,16 +543,7 @@ def build_context_payload(task: dict[str, Any], db_path: Path) -> tuple[str, lis
     return "\n".join(lines), sources
 
 
-def openrouter_model_pricing(model: str) -> tuple[float, float] | None:
-    if model in _OPENROUTER_PRICE_CACHE:
-        return _OPENROUTER_PRICE_CACHE[model]
-
-    enabled = os.getenv("ZHC_COST_LOOKUP_ENABLED", "1").strip()
-    api_key = os.getenv("OPENROUTER_API_KEY", "").strip()
-    if enabled != "1" or not api_key:
-        _OPENROUTER_PRICE_CACHE[model] = None
-        return None
-
+def fetch_openrouter_price_table(api_key: str) -> dict[str, tuple[float, float] | None]:
     timeout_ms = int(os.getenv("ZHC_COST_LOOKUP_TIMEOUT_MS", "3000"))
     req = urllib.request.Request(
         "https://openrouter.ai/api/v1/models",
@@ -468,25 +555,41 @@ def openrouter_model_pricing(model: str) -> tuple[float, float] | None:
     )
     try:
         with urllib.request.urlopen(req, timeout=timeout_ms / 1000) as response:
-            payload = json.loads(response.read().decode("utf-8"))
+            payload = json_loads(response.read())
     except (urllib.error.URLError, TimeoutError, json.JSONDecodeError):
-        _OPENROUTER_PRICE_CACHE[model] = None
-        return None
+        return {}
 
+    table: dict[str, tuple[float, float] | None] = {}
     for entry in payload.get("data", []):
-        if entry.get("id") != model:
+        model = entry.get("id")
+        # First entry wins for duplicate ids, as the old per-model scan did.
+        if model in table:
             continue
         pricing = entry.get("pricing", {})
         try:
             prompt = float(pricing.get("prompt", "0") or 0)
             completion = float(pricing.get("completion", "0") or 0)
         except (TypeError, ValueError):
-            _OPENROUTER_PRICE_CACHE[model] = None
-            return None
-        _OPENROUTER_PRICE_CACHE[model] = (prompt, completion)
-        return _OPENROUTER_PRICE_CACHE[model]
-    _OPENROUTER_PRICE_CACHE[model] = None
-    return None
+            table[model] = None
+            continue
+        table[model] = (prompt, completion)
+    return table
+
+
+def openrouter_model_pricing(model: str) -> tuple[float, float] | None:
+    global _OPENROUTER_PRICE_TABLE, _OPENROUTER_PRICE_FETCHED_AT
+
+    enabled = os.getenv("ZHC_COST_LOOKUP_ENABLED", "1").strip()
+    api_key = os.getenv("OPENROUTER_API_KEY", "").strip()
+    if enabled != "1" or not api_key:
+        return None
+
+    ttl_s = _parse_float(os.getenv("ZHC_COST_LOOKUP_TTL_SECONDS", "3600"), 3600.0, 0.0)
+    now = time.monotonic()
+    if _OPENROUTER_PRICE_TABLE is None or now - _OPENROUTER_PRICE_FETCHED_AT >= ttl_s:
+        _OPENROUTER_PRICE_TABLE = fetch_openrouter_price_table(api_key)
+        _OPENROUTER_PRICE_FETCHED_AT = now
+    return _OPENROUTER_PRICE_TABLE.get(model)
 
 
 def cost_model_hint(model_hint: str) -> str:
@@ -539,29 +642,27 @@ def append_task_event(
     reason: str = "",
     meta: dict[str, Any] | None = None,
 ) -> None:
-    import sqlite3
+    payload: str
+    if trace_id:
+        row: dict[str, Any] = {
+            "trace_id": trace_id,
+            "event": event,
+            "component": "router",
+            "task_id": task_id,
+            "detail": detail,
+        }
+        if status:
+            row["status"] = status
+        if reason:
+            row["reason"] = reason
+        if meta:
+            row["meta"] = meta
+        payload = json.dumps(row, sort_keys=True)
+    else:
+        payload = detail
 
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(db_path) as conn:
-        payload: str
-        if trace_id:
-            row: dict[str, Any] = {
-                "trace_id": trace_id,
-                "event": event,
-                "component": "router",
-                "task_id": task_id,
-                "detail": detail,
-            }
-            if status:
-                row["status"] = status
-            if reason:
-                row["reason"] = reason
-            if meta:
-                row["meta"] = meta
-            payload = json.dumps(row, sort_keys=True)
-        else:
-            payload = detail
-
+    with contextlib.closing(sqlite3.connect(db_path)) as conn:
         conn.execute(
             "INSERT INTO task_events (task_id, event_type, detail, created_at) VALUES (?, ?, ?, ?)",
             (task_id, "router", payload, utc_now()),
@@ -627,7 +728,7 @@ def run_command(
 
 def task_dir(task_id: str) -> Path:
     return (
-        Path(os.getenv("ZHC_STORAGE_ROOT", str(repo_root() / "storage")))
+        Path(os.getenv("ZHC_STORAGE_ROOT", str(_DEFAULT_STORAGE)))
         / "tasks"
         / task_id
     )
@@ -654,7 +755,7 @@ def review_gate_status(task_id: str) -> dict[str, Any]:
 
     if reviewer_present:
         try:
-            payload = json.loads(reviewer_path.read_text(encoding="utf-8"))
+            payload = json_loads(reviewer_path.read_text(encoding="utf-8"))
             reviewer_verdict = str(payload.get("verdict", "missing")).lower().strip()
             reviewer_reason_code = str(payload.get("reason_code", "")).strip()
             checklist = payload.get("checklist", {})
@@ -748,7 +849,7 @@ def dispatch(
             if dispatch_runtime != "single_node":
                 return "blocked", "browser_pilot_single_node_only"
             cmd = [
-                str(repo_root() / "infra/browser/wrappers/zbrowser_safe.sh"),
+                str(_ZBROWSER_SAFE),
                 "--task-type",
                 task_type,
                 "--prompt",
@@ -763,7 +864,7 @@ def dispatch(
 
         if dispatch_runtime == "single_node":
             cmd = [
-                str(repo_root() / "infra/opencode/wrappers/zrun.sh"),
+                str(_ZRUN),
                 "--task-type",
                 task_type,
                 "--prompt",
@@ -781,7 +882,7 @@ def dispatch(
             return "succeeded", f"single_node_local_run task_id={local_task_id}"
 
         cmd = [
-            str(repo_root() / "infra/opencode/wrappers/zdispatch.sh"),
+            str(_ZDISPATCH),
             "--task-type",
             task_type,
             "--prompt",
@@ -805,34 +906,18 @@ def dispatch(
 
 
 def route_task(task_type: str, prompt: str, trace_id: str = "") -> dict[str, Any]:
-    routing_policy = load_policy(
-        Path(
-            os.getenv(
-                "ZHC_ROUTING_POLICY", str(repo_root() / "shared/policies/routing.yaml")
-            )
-        )
+    routing_policy, routing_terms = load_policy_with_terms(
+        Path(os.getenv("ZHC_ROUTING_POLICY", str(_ROUTING_POLICY)))
     )
     approval_policy = load_policy(
-        Path(
-            os.getenv(
-                "ZHC_APPROVAL_POLICY",
-                str(repo_root() / "shared/policies/approvals.yaml"),
-            )
-        )
+        Path(os.getenv("ZHC_APPROVAL_POLICY", str(_APPROVAL_POLICY)))
     )
-    execution_policy = load_policy(
-        Path(
-            os.getenv(
-                "ZHC_EXECUTION_POLICY",
-                str(repo_root() / "shared/policies/execution_policy.yaml"),
-            )
-        )
+    execution_policy, execution_terms = load_policy_with_terms(
+        Path(os.getenv("ZHC_EXECUTION_POLICY", str(_EXECUTION_POLICY)))
     )
-    db_path = Path(
-        os.getenv("ZHC_TASK_DB", str(repo_root() / "storage/tasks/task_registry.db"))
-    ).resolve()
+    db_path = Path(os.getenv("ZHC_TASK_DB", str(_DEFAULT_DB))).resolve()
 
-    route_class, risk_level = classify(task_type, prompt, routing_policy)
+    route_class, risk_level = classify(task_type, prompt, routing_policy, routing_terms)
     mode = autonomy_mode()
     dispatch_runtime = runtime_mode()
     approval_required = requires_approval(risk_level, task_type, approval_policy)
@@ -893,6 +978,7 @@ def route_task(task_type: str, prompt: str, trace_id: str = "") -> dict[str, Any
         route_class,
         mode,
         execution_policy,
+        execution_terms,
     )
     if not policy_allowed:
         run_registry(
@@ -1484,9 +1570,7 @@ def dispatch_task_if_ready(
 def record_plan(
     task_id: str, author: str, summary: str, trace_id: str = ""
 ) -> dict[str, Any]:
-    db_path = Path(
-        os.getenv("ZHC_TASK_DB", str(repo_root() / "storage/tasks/task_registry.db"))
-    ).resolve()
+    db_path = Path(os.getenv("ZHC_TASK_DB", str(_DEFAULT_DB))).resolve()
     task = run_registry(["get", "--task-id", task_id], db_path)
     if not trace_id:
         metadata = task.get("metadata", {})
@@ -1521,9 +1605,7 @@ def record_review(
     notes: str,
     trace_id: str = "",
 ) -> dict[str, Any]:
-    db_path = Path(
-        os.getenv("ZHC_TASK_DB", str(repo_root() / "storage/tasks/task_registry.db"))
-    ).resolve()
+    db_path = Path(os.getenv("ZHC_TASK_DB", str(_DEFAULT_DB))).resolve()
     task = run_registry(["get", "--task-id", task_id], db_path)
     if not trace_id:
         metadata = task.get("metadata", {})
@@ -1596,9 +1678,7 @@ def resume_task(task_id: str, requested_by: str, trace_id: str = "") -> dict[str
     if mode == "readonly":
         raise ValueError("Cannot resume tasks while ZHC_AUTONOMY_MODE=readonly")
 
-    db_path = Path(
-        os.getenv("ZHC_TASK_DB", str(repo_root() / "storage/tasks/task_registry.db"))
-    ).resolve()
+    db_path = Path(os.getenv("ZHC_TASK_DB", str(_DEFAULT_DB))).resolve()
     run_registry(
         [
             "lease-reconcile",
@@ -1674,9 +1754,7 @@ def approve_task(
     if mode == "readonly":
         raise ValueError("Cannot approve/resume tasks while ZHC_AUTONOMY_MODE=readonly")
 
-    db_path = Path(
-        os.getenv("ZHC_TASK_DB", str(repo_root() / "storage/tasks/task_registry.db"))
-    ).resolve()
+    db_path = Path(os.getenv("ZHC_TASK_DB", str(_DEFAULT_DB))).resolve()
 
     task = run_registry(["get", "--task-id", task_id], db_path)
     if not trace_id:
@@ -1851,35 +1929,20 @@ def parse_args() -> argparse.Namespace:
 def main() -> int:
     args = parse_args()
     try:
-        routing_policy = load_policy(
-            Path(
-                os.getenv(
-                    "ZHC_ROUTING_POLICY",
-                    str(repo_root() / "shared/policies/routing.yaml"),
-                )
-            )
+        routing_policy, routing_terms = load_policy_with_terms(
+            Path(os.getenv("ZHC_ROUTING_POLICY", str(_ROUTING_POLICY)))
         )
         approval_policy = load_policy(
-            Path(
-                os.getenv(
-                    "ZHC_APPROVAL_POLICY",
-                    str(repo_root() / "shared/policies/approvals.yaml"),
-                )
-            )
+            Path(os.getenv("ZHC_APPROVAL_POLICY", str(_APPROVAL_POLICY)))
         )
-        execution_policy = load_policy(
-            Path(
-                os.getenv(
-                    "ZHC_EXECUTION_POLICY",
-                    str(repo_root() / "shared/policies/execution_policy.yaml"),
-                )
-            )
+        execution_policy, execution_terms = load_policy_with_terms(
+            Path(os.getenv("ZHC_EXECUTION_POLICY", str(_EXECUTION_POLICY)))
         )
 
         if args.command == "classify":
             mode = autonomy_mode()
             route_class, risk_level = classify(
-                args.task_type, args.prompt, routing_policy
+                args.task_type, args.prompt, routing_policy, routing_terms
             )
             approval_required = requires_approval(
                 risk_level, args.task_type, approval_policy
@@ -1892,6 +1955,7 @@ def main() -> int:
                 route_class,
                 mode,
                 execution_policy,
+                execution_terms,
             )
             out = {
                 "route_class": route_class,
@@ -84,7 +84,13 @@ CREATE TABLE IF NOT EXISTS idempotency_keys (
 
 CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
 CREATE INDEX IF NOT EXISTS idx_tasks_route_class ON tasks(route_class);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at);
+-- json_extract raises on malformed JSON, and older rows can hold '' or non-JSON
+-- metadata_json; the json_valid guard keeps those rows from failing the index
+-- build or any later write that touches them.
+CREATE INDEX IF NOT EXISTS idx_tasks_trace_id_valid ON tasks(CASE WHEN json_valid(metadata_json) THEN json_extract(metadata_json, '$.trace_id') END);
 CREATE INDEX IF NOT EXISTS idx_task_events_task_id ON task_events(task_id);
+CREATE INDEX IF NOT EXISTS idx_task_events_type_created ON task_events(event_type, created_at);
 CREATE INDEX IF NOT EXISTS idx_approvals_task_id ON approvals(task_id);
 CREATE INDEX IF NOT EXISTS idx_artifacts_task_id ON artifacts(task_id);
 CREATE INDEX IF NOT EXISTS idx_dispatch_lease_status_expiry ON task_dispatch_lease(lease_status, lease_expires_at);
@@ -10,7 +10,7 @@ import sqlite3
 import sys
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, NoReturn
 
 
 VALID_TASK_STATUSES = {
@@ -1202,8 +1202,29 @@ def print_out(payload: Any, as_json: bool) -> None:
     print(json.dumps(payload, indent=2, sort_keys=True))
 
 
-def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="ZHC-Nova task registry CLI")
+class _RaisingArgumentParser(argparse.ArgumentParser):
+    # For in-process callers: report bad arguments as ArgumentError carrying
+    # the CLI's usage/error text instead of printing it and exiting.
+    def error(self, message: str) -> NoReturn:
+        raise argparse.ArgumentError(
+            None, f"{self.format_usage()}{self.prog}: error: {message}"
+        )
+
+
+def parse_args(
+    argv: list[str] | None = None, exit_on_error: bool = True
+) -> argparse.Namespace:
+    if exit_on_error:
+        parser = argparse.ArgumentParser(description="ZHC-Nova task registry CLI")
+    else:
+        # Subparsers inherit the parser class, so they raise too; the top
+        # level must not catch their ArgumentError and re-report it with its
+        # own usage.
+        parser = _RaisingArgumentParser(
+            prog=Path(__file__).name,
+            description="ZHC-Nova task registry CLI",
+            exit_on_error=False,
+        )
     parser.add_argument("--db", default=str(default_db_path()), help="SQLite DB path")
     parser.add_argument(
         "--schema", default=str(default_schema_path()), help="SQL schema path"
@@ -1352,221 +1373,181 @@ def parse_args() -> argparse.Namespace:
     p_ops_summary = sub.add_parser("ops-summary", help="Compact operations summary")
     p_ops_summary.add_argument("--hours", type=int, default=24)
 
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
-def main() -> int:
-    args = parse_args()
+def execute(args: argparse.Namespace) -> Any:
+    """Run one parsed non-init command and return its payload."""
     db_path = Path(args.db).resolve()
-    schema_path = Path(args.schema).resolve()
+    init_db(db_path, Path(args.schema).resolve())
 
-    try:
-        if args.command == "init":
-            init_db(db_path, schema_path)
-            print(f"Initialized DB: {db_path}")
-            return 0
+    if args.command == "create":
+        try:
+            metadata = json.loads(args.metadata)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"--metadata must be valid JSON: {exc}") from exc
+        return create_task(
+            db_path=db_path,
+            task_id=args.task_id,
+            task_type=args.task_type,
+            prompt=args.prompt,
+            route_class=args.route_class,
+            status=args.status,
+            requires_approval=args.requires_approval,
+            risk_level=args.risk_level,
+            assigned_worker=args.assigned_worker,
+            metadata=metadata,
+        )
 
-        init_db(db_path, schema_path)
+    if args.command == "update":
+        return update_task(
+            db_path,
+            args.task_id,
+            args.status,
+            args.detail,
+            force=args.force,
+        )
 
-        if args.command == "create":
-            try:
-                metadata = json.loads(args.metadata)
-            except json.JSONDecodeError as exc:
-                raise ValueError(f"--metadata must be valid JSON: {exc}") from exc
-            result = create_task(
-                db_path=db_path,
-                task_id=args.task_id,
-                task_type=args.task_type,
-                prompt=args.prompt,
-                route_class=args.route_class,
-                status=args.status,
-                requires_approval=args.requires_approval,
-                risk_level=args.risk_level,
-                assigned_worker=args.assigned_worker,
-                metadata=metadata,
-            )
-            print_out(result, args.json)
-            return 0
+    if args.command == "get":
+        return get_task(db_path, args.task_id)
 
-        if args.command == "update":
-            result = update_task(
-                db_path,
-                args.task_id,
-                args.status,
-                args.detail,
-                force=args.force,
-            )
-            print_out(result, args.json)
-            return 0
+    if args.command == "list":
+        return list_tasks(db_path, args.limit)
 
-        if args.command == "get":
-            result = get_task(db_path, args.task_id)
-            print_out(result, args.json)
-            return 0
+    if args.command == "telemetry":
+        return telemetry_summary(db_path, args.limit)
 
-        if args.command == "list":
-            result = list_tasks(db_path, args.limit)
-            print_out(result, args.json)
-            return 0
+    if args.command == "approval-request":
+        return request_approval(
+            db_path=db_path,
+            task_id=args.task_id,
+            action_category=args.action_category,
+            requested_by=args.requested_by,
+            note=args.note,
+        )
 
-        if args.command == "telemetry":
-            result = telemetry_summary(db_path, args.limit)
-            print_out(result, args.json)
-            return 0
+    if args.command == "approval-decide":
+        return decide_approval(
+            db_path=db_path,
+            task_id=args.task_id,
+            action_category=args.action_category,
+            decision=args.decision,
+            decided_by=args.decided_by,
+            note=args.note,
+        )
 
-        if args.command == "approval-request":
-            result = request_approval(
-                db_path=db_path,
-                task_id=args.task_id,
-                action_category=args.action_category,
-                requested_by=args.requested_by,
-                note=args.note,
-            )
-            print_out(result, args.json)
-            return 0
+    if args.command == "approval-list":
+        return get_approvals(db_path, args.task_id)
 
-        if args.command == "approval-decide":
-            result = decide_approval(
-                db_path=db_path,
-                task_id=args.task_id,
-                action_category=args.action_category,
-                decision=args.decision,
-                decided_by=args.decided_by,
-                note=args.note,
-            )
-            print_out(result, args.json)
-            return 0
+    if args.command == "metadata-merge":
+        try:
+            metadata_patch = json.loads(args.metadata)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"--metadata must be valid JSON: {exc}") from exc
+        if not isinstance(metadata_patch, dict):
+            raise ValueError("--metadata must decode to a JSON object")
+        return merge_task_metadata(
+            db_path=db_path,
+            task_id=args.task_id,
+            metadata_patch=metadata_patch,
+            detail=args.detail,
+        )
 
-        if args.command == "approval-list":
-            result = get_approvals(db_path, args.task_id)
-            print_out(result, args.json)
-            return 0
+    if args.command == "lease-enqueue":
+        return enqueue_dispatch_lease(
+            db_path,
+            args.task_id,
+            args.owner_id,
+            args.lease_seconds,
+        )
 
-        if args.command == "metadata-merge":
-            try:
-                metadata_patch = json.loads(args.metadata)
-            except json.JSONDecodeError as exc:
-                raise ValueError(f"--metadata must be valid JSON: {exc}") from exc
-            if not isinstance(metadata_patch, dict):
-                raise ValueError("--metadata must decode to a JSON object")
-            result = merge_task_metadata(
-                db_path=db_path,
-                task_id=args.task_id,
-                metadata_patch=metadata_patch,
-                detail=args.detail,
-            )
-            print_out(result, args.json)
-            return 0
+    if args.command == "lease-claim":
+        return claim_dispatch_lease(
+            db_path,
+            args.task_id,
+            args.owner_id,
+            args.lease_seconds,
+        )
 
-        if args.command == "lease-enqueue":
-            result = enqueue_dispatch_lease(
-                db_path,
-                args.task_id,
-                args.owner_id,
-                args.lease_seconds,
-            )
-            print_out(result, args.json)
-            return 0
+    if args.command == "lease-heartbeat":
+        return heartbeat_dispatch_lease(
+            db_path,
+            args.task_id,
+            args.owner_id,
+            args.lease_seconds,
+        )
 
-        if args.command == "lease-claim":
-            result = claim_dispatch_lease(
-                db_path,
-                args.task_id,
-                args.owner_id,
-                args.lease_seconds,
-            )
-            print_out(result, args.json)
-            return 0
+    if args.command == "lease-finish":
+        return finish_dispatch_lease(
+            db_path,
+            args.task_id,
+            args.owner_id,
+            args.result_status,
+            args.last_error,
+        )
 
-        if args.command == "lease-heartbeat":
-            result = heartbeat_dispatch_lease(
-                db_path,
-                args.task_id,
-                args.owner_id,
-                args.lease_seconds,
-            )
-            print_out(result, args.json)
-            return 0
+    if args.command == "lease-reconcile":
+        return reconcile_dispatch_leases(db_path, args.owner_id)
 
-        if args.command == "lease-finish":
-            result = finish_dispatch_lease(
-                db_path,
-                args.task_id,
-                args.owner_id,
-                args.result_status,
-                args.last_error,
-            )
-            print_out(result, args.json)
-            return 0
+    if args.command == "lease-get":
+        return get_dispatch_lease(db_path, args.task_id)
 
-        if args.command == "lease-reconcile":
-            result = reconcile_dispatch_leases(db_path, args.owner_id)
-            print_out(result, args.json)
-            return 0
+    if args.command == "lease-list":
+        status = args.status.strip().lower() or None
+        return list_dispatch_leases(db_path, status, args.limit)
 
-        if args.command == "lease-get":
-            result = get_dispatch_lease(db_path, args.task_id)
-            print_out(result, args.json)
-            return 0
+    if args.command == "idempo-begin":
+        return begin_idempotency(
+            db_path,
+            args.key,
+            args.scope,
+            args.payload_hash,
+            args.task_id.strip() or None,
+        )
 
-        if args.command == "lease-list":
-            status = args.status.strip().lower() or None
-            result = list_dispatch_leases(db_path, status, args.limit)
-            print_out(result, args.json)
-            return 0
+    if args.command == "idempo-complete":
+        # validate JSON early
+        try:
+            json.loads(args.result_json)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"--result-json must be valid JSON: {exc}") from exc
+        return complete_idempotency(
+            db_path,
+            args.key,
+            args.status,
+            args.result_json,
+        )
 
-        if args.command == "idempo-begin":
-            result = begin_idempotency(
-                db_path,
-                args.key,
-                args.scope,
-                args.payload_hash,
-                args.task_id.strip() or None,
-            )
-            print_out(result, args.json)
-            return 0
+    if args.command == "idempo-get":
+        return get_idempotency(db_path, args.key)
 
-        if args.command == "idempo-complete":
-            # validate JSON early
-            try:
-                json.loads(args.result_json)
-            except json.JSONDecodeError as exc:
-                raise ValueError(f"--result-json must be valid JSON: {exc}") from exc
-            result = complete_idempotency(
-                db_path,
-                args.key,
-                args.status,
-                args.result_json,
-            )
-            print_out(result, args.json)
-            return 0
+    if args.command == "idempo-list":
+        return list_idempotency(db_path, args.scope, args.limit)
 
-        if args.command == "idempo-get":
-            result = get_idempotency(db_path, args.key)
-            print_out(result, args.json)
-            return 0
+    if args.command == "events":
+        return list_events(db_path, args.task_id, args.limit)
 
-        if args.command == "idempo-list":
-            result = list_idempotency(db_path, args.scope, args.limit)
-            print_out(result, args.json)
-            return 0
+    if args.command == "trace-events":
+        return trace_events(db_path, args.trace_id, args.limit)
 
-        if args.command == "events":
-            result = list_events(db_path, args.task_id, args.limit)
-            print_out(result, args.json)
-            return 0
+    if args.command == "ops-summary":
+        return ops_summary(db_path, args.hours)
 
-        if args.command == "trace-events":
-            result = trace_events(db_path, args.trace_id, args.limit)
-            print_out(result, args.json)
-            return 0
+    raise ValueError(f"Unknown command: {args.command}")
+
+
+def main() -> int:
+    args = parse_args()
 
-        if args.command == "ops-summary":
-            result = ops_summary(db_path, args.hours)
-            print_out(result, args.json)
+    try:
+        if args.command == "init":
+            db_path = Path(args.db).resolve()
+            init_db(db_path, Path(args.schema).resolve())
+            print(f"Initialized DB: {db_path}")
             return 0
 
-        raise ValueError(f"Unknown command: {args.command}")
+        print_out(execute(args), args.json)
+        return 0
     except Exception as exc:
         print(f"ERROR: {exc}", file=sys.stderr)
         return 1
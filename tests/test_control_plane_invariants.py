@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import json
 import os
 import runpy
 import tempfile
@@ -145,6 +146,55 @@ class ControlPlaneInvariantTests(unittest.TestCase):
         self.assertEqual(ok_status, "succeeded")
         self.assertIn("browser_pilot_run", ok_detail)
 
+    def test_review_gate_sees_same_size_rewrite(self) -> None:
+        task_id = "task-review-rewrite-1"
+        checklist = {key: True for key in self.router["REVIEW_CHECKLIST_KEYS"]}
+        self.router["write_planner_artifact"](task_id, "@planner", "scope")
+        path = self.router["write_reviewer_artifact"](
+            task_id, "@reviewer", "fail", "other", checklist, "n"
+        )
+        stat = path.stat()
+        gate = self.router["review_gate_status"](task_id)
+        self.assertFalse(gate["gate_passed"])
+
+        # Same size and same mtime, as a rewrite within one timestamp tick.
+        rewritten = path.read_text(encoding="utf-8").replace('"fail"', '"pass"')
+        path.write_text(rewritten, encoding="utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(path.stat().st_size, stat.st_size)
+
+        gate = self.router["review_gate_status"](task_id)
+        self.assertEqual(gate["reviewer_verdict"], "pass")
+        self.assertTrue(gate["gate_passed"])
+
+    def test_load_policy_returns_plain_json(self) -> None:
+        path = ROOT / "shared/policies/routing.yaml"
+        policy = self.router["load_policy"](path)
+        self.assertEqual(policy, json.loads(path.read_text(encoding="utf-8")))
+        policy, terms = self.router["load_policy_with_terms"](path)
+        self.assertEqual(policy, self.router["load_policy"](path))
+        self.assertIn("refactor", terms["heavy"])
+
+    def test_edited_policy_is_reread(self) -> None:
+        path = self.tmp_path / "routing.yaml"
+        rules = '{"keyword_rules": {"ubuntu_heavy": ["%s"]}}'
+        path.write_text(rules % "refactor", encoding="utf-8")
+        stat = path.stat()
+        policy, terms = self.router["load_policy_with_terms"](path)
+        self.assertEqual(
+            self.router["classify"]("ping", "refactor it", policy, terms)[0],
+            "UBUNTU_HEAVY",
+        )
+
+        # Same size and same mtime, as an edit within one timestamp tick.
+        path.write_text(rules % "compiles", encoding="utf-8")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        policy, terms = self.router["load_policy_with_terms"](path)
+        self.assertEqual(
+            self.router["classify"]("ping", "refactor it", policy, terms)[0],
+            "PI_LIGHT",
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
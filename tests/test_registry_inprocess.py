@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import os
+import runpy
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+REGISTRY_PATH = ROOT / "shared/task-registry/task_registry.py"
+ROUTER_PATH = ROOT / "services/task-router/router.py"
+
+
+class RegistryInProcessTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Path(self.tmp.name) / "task_registry.db"
+
+        self.registry = runpy.run_path(str(REGISTRY_PATH))
+        self.router = runpy.run_path(str(ROUTER_PATH))
+        self.registry["init_db"](self.db, ROOT / "shared/task-registry/schema.sql")
+        self.registry["create_task"](
+            self.db,
+            "task-inprocess-1",
+            "code_refactor",
+            "in-process parity",
+            "UBUNTU_HEAVY",
+            "pending",
+            True,
+            "medium",
+            None,
+            {"trace_id": "tg-1"},
+        )
+
+        self._env_backup = dict(os.environ)
+        os.environ["ZHC_TASK_DB"] = str(self.db)
+        # Same usage wrapping in-process as in the piped subprocess.
+        os.environ["COLUMNS"] = "80"
+
+    def tearDown(self) -> None:
+        os.environ.clear()
+        os.environ.update(self._env_backup)
+        self.tmp.cleanup()
+
+    def _both(self, args: list[str]) -> tuple[object, object]:
+        results = []
+        for subprocess_mode in ("0", "1"):
+            os.environ["ZHC_REGISTRY_SUBPROCESS"] = subprocess_mode
+            try:
+                results.append(self.router["run_registry"](args, self.db))
+            except RuntimeError as exc:
+                results.append(("error", str(exc)))
+        return results[0], results[1]
+
+    def test_payloads_match_subprocess_path(self) -> None:
+        for args in (
+            ["get", "--task-id", "task-inprocess-1"],
+            ["events", "--task-id", "task-inprocess-1"],
+            ["lease-get", "--task-id", "task-inprocess-1"],
+        ):
+            in_process, subprocess_out = self._both(args)
+            self.assertEqual(in_process, subprocess_out, args)
+
+    def test_errors_match_subprocess_path(self) -> None:
+        for args in (
+            ["get", "--task-id", "task-missing"],
+            ["update", "--task-id", "task-inprocess-1", "--status", "bogus"],
+            [
+                "approval-decide",
+                "--task-id",
+                "task-inprocess-1",
+                "--action-category",
+                "deploy_restart",
+                "--decision",
+                "approve",
+                "--decided-by",
+                "tester",
+            ],
+        ):
+            in_process, subprocess_out = self._both(args)
+            self.assertEqual(in_process[0], "error", args)
+            self.assertEqual(in_process, subprocess_out, args)
+
+
+if __name__ == "__main__":
+    unittest.main()